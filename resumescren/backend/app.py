@@ -1,13 +1,15 @@
 # AI-Powered Resume Screening Tool Backend
 # Flask app entry point
 
-from flask import Flask, request, jsonify, send_from_directory, render_template, redirect, url_for, flash, session
+from flask import Flask, Response, stream_with_context, request, jsonify, send_file, send_from_directory, render_template, redirect, url_for, flash, session, g
 from flask_cors import CORS
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import time
 import logging
 import json
 import csv
@@ -16,6 +18,13 @@ from datetime import datetime
 from io import StringIO
 import uuid
 import ats_utils  # Import the ATS utilities
+import db
+import upload_jobs
+import resume_store
+import text_cache
+import metrics
+import profiling
+import memory_cache
 
 # Initialize extensions
 login_manager = LoginManager()
@@ -23,12 +32,12 @@ login_manager.login_view = 'login'
 
 # Database setup
 def get_db_connection():
-    conn = sqlite3.connect('resume_screener.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Return the pooled connection for the current request"""
+    return db.get_db()
 
 def init_db():
-    with get_db_connection() as conn:
+    conn = db.connect()
+    with conn:
         # Users table
         conn.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -50,9 +59,17 @@ def init_db():
                 match_score REAL,
                 filepath TEXT,
                 processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                content_hash TEXT,
                 FOREIGN KEY (user_id) REFERENCES users (id)
             )
         ''')
+        # Databases created before content_hash was added
+        history_columns = {row['name'] for row in conn.execute('PRAGMA table_info(resume_history)')}
+        if 'content_hash' not in history_columns:
+            conn.execute('ALTER TABLE resume_history ADD COLUMN content_hash TEXT')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_resume_history_content_hash ON resume_history (content_hash)')
+        # Ranking looks up each user's uploads (see resume_store)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_resume_history_user_hash ON resume_history (user_id, content_hash)')
         
         # Job templates table
         conn.execute('''
@@ -79,7 +96,12 @@ def init_db():
             )
         ''')
         
-        conn.commit()
+        # Background upload job tables
+        upload_jobs.init_schema(conn)
+        
+        # Resume pool used by /api/rank-resumes
+        resume_store.init_schema(conn)
+    conn.close()
 
 # Initialize database tables
 init_db()
@@ -95,7 +117,6 @@ class User(UserMixin):
 def load_user(user_id):
     conn = get_db_connection()
     user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
-    conn.close()
     if user is None:
         return None
     return User(user['id'], user['username'], user['email'])
@@ -122,15 +143,64 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 # Initialize extensions
 CORS(app, supports_credentials=True, origins=['http://localhost:3000', 'http://localhost:5000'])
 login_manager.init_app(app)
+db.init_app(app)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-
-# Ensure upload directory exists
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+MAX_TOP_TERMS = 500  # Upper bound for the top_k important terms parameter
+# Files of an upload are processed concurrently on a pool shared by all requests.
+# Extraction already runs in its own child process (see extraction_guard), so
+# threads are enough to keep several PDFs parsing at once.
+UPLOAD_WORKERS = int(os.environ.get('UPLOAD_WORKERS') or os.cpu_count() or 4)
+upload_pool = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix='upload-file')
+# Scores of already seen resumes, keyed by content hash, extractor, job description, top_k and model
+SCORE_CACHE_MAX_BYTES = int(os.environ.get('SCORE_CACHE_MAX_BYTES') or 16 * 1024 * 1024)
+score_cache = memory_cache.MemoryLRUCache(SCORE_CACHE_MAX_BYTES)
+
+# Load the corpus-fitted TF-IDF model once at startup
+if ats_utils.load_vectorizer() is not None:
+    logger.info(f"Loaded TF-IDF model from {ats_utils.TFIDF_MODEL_PATH}")
+else:
+    logger.warning("No TF-IDF model found, scoring will fit per resume. Run build_model.py to create one.")
+
+# Upload processing metrics, exposed by /api/metrics
+UPLOAD_STAGE_SECONDS = metrics.histogram(
+    'resume_upload_stage_seconds', 'Time spent in each stage of processing an uploaded resume', ['stage']
+)
+UPLOAD_REQUEST_SECONDS = metrics.histogram(
+    'resume_upload_request_seconds', 'Total /api/upload request time', ['mode']
+)
+UPLOAD_FILES = metrics.counter('resume_upload_files_total', 'Uploaded resumes by outcome', ['status'])
+UPLOAD_BYTES = metrics.counter('resume_upload_bytes_total', 'Bytes of uploaded resumes processed')
+UPLOAD_PAGES = metrics.histogram(
+    'resume_upload_pdf_pages', 'Pages per uploaded PDF', buckets=(1, 2, 3, 5, 10, 20, 30, 50, 100)
+)
+EXTRACTION_CACHE = metrics.counter(
+    'resume_extraction_cache_total', 'Text cache lookups for uploaded resumes', ['result']
+)
+
+def collect_jd_cache_metrics():
+    stats = ats_utils.get_jd_cache_stats()
+    return [
+        ('resume_jd_cache_hits_total', 'counter', 'Job description cache hits', stats['hits']),
+        ('resume_jd_cache_misses_total', 'counter', 'Job description cache misses', stats['misses']),
+        ('resume_jd_cache_evictions_total', 'counter', 'Job description cache evictions', stats['evictions']),
+        ('resume_jd_cache_entries', 'gauge', 'Job descriptions currently cached', stats['entries']),
+        ('resume_jd_cache_bytes', 'gauge', 'Approximate memory used by the job description cache', stats['bytes'])
+    ]
+
+metrics.register_collector(collect_jd_cache_metrics)
+
+def collect_score_cache_metrics():
+    stats = score_cache.stats()
+    return [
+        ('resume_score_cache_hits_total', 'counter', 'Resume score cache hits', stats['hits']),
+        ('resume_score_cache_misses_total', 'counter', 'Resume score cache misses', stats['misses']),
+        ('resume_score_cache_entries', 'gauge', 'Resume scores currently cached', stats['entries'])
+    ]
+
+metrics.register_collector(collect_score_cache_metrics)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -141,13 +211,292 @@ def health_check():
     return jsonify({
         'status': 'ok',
         'service': 'resume-screener-api',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'jd_cache': ats_utils.get_jd_cache_stats()
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Metrics in the Prometheus text exposition format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def save_history(conn, rows):
+    """
+    Insert resume_history rows with one executemany and commit
+    
+    Args:
+        conn: Database connection
+        rows: List of (user_id, filename, job_title, match_score, content_hash) tuples
+        
+    Returns:
+        list: The ids of the inserted rows, in order
+    """
+    if not rows:
+        return []
+    with conn:
+        conn.executemany(
+            'INSERT INTO resume_history (user_id, filename, job_title, match_score, content_hash) VALUES (?, ?, ?, ?, ?)',
+            rows
+        )
+        # The write lock is held until commit, so the AUTOINCREMENT ids are consecutive
+        last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+def process_resume_file(filename, content, job_desc, cache_key=None, top_k=ats_utils.DEFAULT_TOP_TERMS):
+    """
+    Validate, parse and score a single uploaded resume
+    
+    Args:
+        filename: Name of the uploaded file as sent by the client
+        content: File contents as bytes or a binary stream
+        job_desc: Job description to score against
+        cache_key: Optional job description cache key (see ats_utils.job_cache_key)
+        top_k: Number of important job description terms to report
+        
+    Returns:
+        dict: The per-file result returned to the client
+    """
+    file_result = {'filename': filename, 'error': None}
+    
+    if filename == '':
+        file_result['error'] = 'Empty filename'
+        UPLOAD_FILES.inc(status='rejected')
+        return file_result
+        
+    if not allowed_file(filename):
+        file_result['error'] = f'Invalid file type: {filename}. Allowed types: pdf, docx, doc'
+        UPLOAD_FILES.inc(status='rejected')
+        return file_result
+    
+    # Process the file straight from the upload stream, without a temp file
+    filename = secure_filename(filename)
+    
+    try:
+        with UPLOAD_STAGE_SECONDS.time(stage='file_total'):
+            with UPLOAD_STAGE_SECONDS.time(stage='read'):
+                if hasattr(content, 'read'):
+                    content = content.read()
+            UPLOAD_BYTES.inc(len(content))
+            content_hash = text_cache.hash_content(content)
+            file_result['content_hash'] = content_hash
+            
+            # A file uploaded before (under any name) skips extraction entirely, unless
+            # the extractor configuration has changed since
+            extractor = ats_utils.extractor_id(filename)
+            with UPLOAD_STAGE_SECONDS.time(stage='dedup'), db.connection() as conn:
+                stored = resume_store.store.get(conn, content_hash, extractor=extractor)
+            
+            if stored is not None:
+                resume_text = stored['text']
+                contact_info = stored['contact'] or {}
+                extraction = {'cached': True, 'duplicate': True}
+                EXTRACTION_CACHE.inc(result='duplicate')
+            else:
+                # Parse resume
+                extraction = {}
+                with UPLOAD_STAGE_SECONDS.time(stage='extract'):
+                    resume_text = ats_utils.parse_resume(content, filename=filename, stats=extraction)
+                EXTRACTION_CACHE.inc(result='hit' if extraction.get('cached') else 'miss')
+                if extraction.get('pages'):
+                    UPLOAD_PAGES.observe(extraction['pages'])
+                
+                with UPLOAD_STAGE_SECONDS.time(stage='contact'):
+                    contact_info = ats_utils.extract_contact_info(resume_text)
+                
+                # Keep the resume in the pool so later job descriptions can be ranked against it
+                with UPLOAD_STAGE_SECONDS.time(stage='store'), db.connection() as conn:
+                    resume_store.store.add(conn, content_hash, filename, resume_text, contact_info, extractor=extractor)
+            
+            # Calculate match score with job description, unless this resume was already
+            # scored against it
+            cache_key = cache_key or ats_utils.job_cache_key(job_desc)
+            score_key = (content_hash, extractor, cache_key, top_k, ats_utils.get_model_id())
+            cached_score = score_cache.get(score_key)
+            if cached_score is not None:
+                match_score, match_details = cached_score[0], dict(cached_score[1])
+            else:
+                with UPLOAD_STAGE_SECONDS.time(stage='score'):
+                    match_score, match_details = ats_utils.calculate_match_score(resume_text, job_desc, cache_key, top_k)
+                score_cache.put(score_key, (match_score, dict(match_details)), len(repr(match_details)))
+        
+        # Add contact info and extraction timing to match details
+        match_details['contact'] = contact_info
+        match_details['extraction'] = extraction
+        
+        file_result.update({
+            'success': True,
+            'match_score': match_score,
+            'details': match_details,
+            'contact_info': contact_info,  # Add contact information to the response
+            'name': contact_info.get('name', 'Name not found'),
+            'email': contact_info.get('email', 'N/A'),
+            'phone': contact_info.get('phone', 'N/A')
+        })
+        
+        UPLOAD_FILES.inc(status='success')
+        logger.info(f"Processed {filename}. Match score: {match_score}")
+        
+    except ats_utils.ExtractionError as e:
+        # The file hit the extraction time or memory limit; the rest of the batch carries on
+        logger.warning(f"Extraction of {filename} stopped: {str(e)}")
+        file_result['error'] = f'Error processing file: {str(e)}'
+        file_result['error_code'] = e.code
+        UPLOAD_FILES.inc(status=e.code)
+    except Exception as e:
+        logger.error(f"Error processing file {filename}: {str(e)}", exc_info=True)
+        file_result['error'] = f'Error processing file: {str(e)}'
+        UPLOAD_FILES.inc(status='failed')
+    
+    return file_result
+
+def iter_upload_results(uploads, job_desc, cache_key=None, top_k=ats_utils.DEFAULT_TOP_TERMS, inline=False):
+    """
+    Process uploaded files concurrently on the shared upload pool
+    
+    Args:
+        uploads: List of (filename, content bytes) tuples
+        inline: Process the files one by one on the calling thread instead, e.g. so
+            cProfile (which only sees the thread that enabled it) covers them
+        
+    Yields:
+        tuple: (index in uploads, per-file result) in completion order. A file that
+        fails only affects its own result.
+    """
+    if inline:
+        for index, (filename, content) in enumerate(uploads):
+            yield index, process_resume_file(filename, content, job_desc, cache_key, top_k)
+        return
+    
+    futures = {
+        upload_pool.submit(process_resume_file, filename, content, job_desc, cache_key, top_k): index
+        for index, (filename, content) in enumerate(uploads)
+    }
+    for future in as_completed(futures):
+        index = futures[future]
+        try:
+            file_result = future.result()
+        except Exception as e:
+            filename = uploads[index][0]
+            logger.error(f"Error processing file {filename}: {str(e)}", exc_info=True)
+            file_result = {'filename': filename, 'error': f'Error processing file: {str(e)}'}
+        yield index, file_result
+
+def process_uploads(uploads, job_desc, cache_key=None, top_k=ats_utils.DEFAULT_TOP_TERMS, inline=False):
+    """Process uploaded files concurrently and return their results in upload order"""
+    results = [None] * len(uploads)
+    for index, file_result in iter_upload_results(uploads, job_desc, cache_key, top_k, inline):
+        results[index] = file_result
+    return results
+
+def load_template_description(conn, template_id, user_id):
+    """Return the description of a template visible to the user, or None"""
+    template = conn.execute(
+        'SELECT description FROM job_templates WHERE id = ? AND (is_public = 1 OR user_id = ?)',
+        (template_id, user_id)
+    ).fetchone()
+    return template['description'] if template else None
+
+def save_results_history(conn, user_id, job_desc, results):
+    """Save the successful results to history in a single transaction and attach their resume ids"""
+    successful = [r for r in results if r.get('success')]
+    with UPLOAD_STAGE_SECONDS.time(stage='db_write'):
+        resume_ids = save_history(conn, [
+            (user_id, secure_filename(r['filename']), job_desc[:100], r['match_score'], r.get('content_hash'))
+            for r in successful
+        ])
+    for file_result, resume_id in zip(successful, resume_ids):
+        file_result['resume_id'] = resume_id
+
+def _stream_record(record, stream_format):
+    """Encode one streamed upload record as an NDJSON line or a Server-Sent Event"""
+    data = json.dumps(record)
+    if stream_format == 'sse':
+        return f"event: {record['type']}\ndata: {data}\n\n"
+    return data + '\n'
+
+def stream_upload_results(uploads, job_desc, cache_key, top_k, stream_format, start_time, inline=False):
+    """
+    Process uploaded files concurrently and stream each result as soon as it is ready
+    
+    Emits a 'result' record per file in completion order, with its index in the
+    upload, then a
+    'summary' record once history has been saved, or an 'error' record if the
+    batch fails part-way. If the client disconnects, the remaining files are
+    still processed and the batch is saved to history, as a non-streamed upload
+    would be.
+    
+    Args:
+        uploads: List of (filename, content bytes) tuples, read before streaming starts
+            since the request's file streams are closed once the view returns
+        stream_format: 'ndjson' (application/x-ndjson) or 'sse' (text/event-stream)
+        inline: Process the files on the streaming thread (see iter_upload_results)
+    """
+    user_id = current_user.id
+    total = len(uploads)
+    
+    def generate():
+        results = [None] * total
+        pending = iter_upload_results(uploads, job_desc, cache_key, top_k, inline)
+        try:
+            try:
+                for index, file_result in pending:
+                    results[index] = file_result
+                    yield _stream_record({'type': 'result', 'index': index, 'total_files': total, 'result': file_result}, stream_format)
+            except GeneratorExit:
+                # The client went away; nothing more can be sent, but the upload is kept
+                logger.info("Upload stream closed early, finishing the batch for history")
+                try:
+                    for index, file_result in pending:
+                        results[index] = file_result
+                    save_results_history(get_db_connection(), user_id, job_desc, results)
+                except Exception as e:
+                    logger.error(f"Error saving upload after the stream closed: {str(e)}", exc_info=True)
+                raise
+            
+            save_results_history(get_db_connection(), user_id, job_desc, results)
+            UPLOAD_REQUEST_SECONDS.observe(time.perf_counter() - start_time, mode=stream_format)
+            yield _stream_record({
+                'type': 'summary',
+                'success': True,
+                'total_files': total,
+                'processed': len([r for r in results if r.get('success')]),
+                'failed': len([r for r in results if r.get('error')]),
+                'resume_ids': [r.get('resume_id') for r in results]
+            }, stream_format)
+        except Exception as e:
+            logger.error(f"Unexpected error while streaming upload results: {str(e)}", exc_info=True)
+            yield _stream_record({'type': 'error', 'error': 'Internal server error', 'details': str(e)}, stream_format)
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop reverse proxies from buffering the stream
+    return response
+
+# Background queue for asynchronous uploads
+job_queue = upload_jobs.JobQueue(process_resume_file, finalize_fn=save_results_history)
+
+@app.before_request
+def start_job_queue():
+    # Started lazily so only the process actually serving requests runs jobs
+    job_queue.start()
+
 @app.route('/api/upload', methods=['POST'])
 @login_required
+@profiling.profiled
 def upload_resume():
-    """Handle multiple resume file uploads and job matching"""
+    """
+    Handle multiple resume file uploads and job matching
+    
+    With async=true (form field or query parameter) the files are queued and a
+    job id is returned immediately; progress is available from /api/jobs/<job_id>.
+    With stream=ndjson or stream=sse each file's result is streamed as soon as it
+    is ready, followed by a summary record.
+    A template_id may be sent instead of job_description to score against a saved
+    job template, and top_k sets how many important terms are reported per resume.
+    Admins can capture a cProfile of the request with the X-Profile: 1 header.
+    """
+    start_time = time.perf_counter()
     try:
         logger.info("Received upload request")
         
@@ -155,105 +504,57 @@ def upload_resume():
         if 'resume' not in request.files:
             logger.error("No file part in the request")
             return jsonify({'error': 'No file part'}), 400
+        
+        top_k = request.form.get('top_k', ats_utils.DEFAULT_TOP_TERMS, type=int)
+        if not 1 <= top_k <= MAX_TOP_TERMS:
+            return jsonify({'error': f'top_k must be between 1 and {MAX_TOP_TERMS}'}), 400
             
-        if 'job_description' not in request.form:
+        template_id = request.form.get('template_id', type=int)
+        if template_id is not None:
+            job_desc = load_template_description(get_db_connection(), template_id, current_user.id)
+            if job_desc is None:
+                return jsonify({'error': 'Template not found'}), 404
+        elif 'job_description' in request.form:
+            job_desc = request.form['job_description']
+        else:
             logger.error("No job description provided")
             return jsonify({'error': 'Job description is required'}), 400
         
         files = request.files.getlist('resume')
-        job_desc = request.form['job_description']
+        cache_key = ats_utils.job_cache_key(job_desc, template_id)
         
         if not files or not any(files):
             logger.error("No files selected")
             return jsonify({'error': 'No files selected'}), 400
         
-        results = []
+        is_async = request.values.get('async', 'false').lower() in ('1', 'true', 'yes')
+        if is_async:
+            job_id = job_queue.submit(current_user.id, job_desc, [(file.filename, file.read()) for file in files],
+                                      cache_key=cache_key, top_k=top_k)
+            logger.info(f"Queued upload job {job_id} with {len(files)} files")
+            UPLOAD_REQUEST_SECONDS.observe(time.perf_counter() - start_time, mode='async')
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': 'queued',
+                'total_files': len(files),
+                'status_url': url_for('get_job', job_id=job_id)
+            }), 202
         
-        for file in files:
-            file_result = {'filename': file.filename, 'error': None}
-            
-            if file.filename == '':
-                file_result['error'] = 'Empty filename'
-                results.append(file_result)
-                continue
-                
-            if not allowed_file(file.filename):
-                file_result['error'] = f'Invalid file type: {file.filename}. Allowed types: pdf, docx, doc'
-                results.append(file_result)
-                continue
-            
-            # Process the file
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            
-            try:
-                file.save(filepath)
-                logger.info(f"File saved to {filepath}")
-                
-                # Parse resume
-                resume_text = ats_utils.parse_resume(filepath)
-                
-                # For now, use basic contact extraction from the raw text
-                # In a real implementation, you'd use a proper resume parser
-                contact_info = {
-                    'name': 'Unknown',
-                    'email': 'Not found',
-                    'phone': 'Not found'
-                }
-                
-                # Simple contact extraction (very basic)
-                lines = resume_text.split('\n')
-                for line in lines[:5]:  # Check first 5 lines
-                    line = line.strip()
-                    if '@' in line and '.' in line and ' ' not in line.strip():
-                        contact_info['email'] = line.strip()
-                    elif any(char.isdigit() for char in line) and len(line) > 8:
-                        contact_info['phone'] = line.strip()
-                    elif len(line.split()) <= 3 and len(line) > 2 and not any(char.isdigit() for char in line):
-                        contact_info['name'] = line.strip()
-                
-                # Calculate match score with job description
-                match_score, match_details = ats_utils.calculate_match_score(resume_text, job_desc)
-                
-                # Add contact info to match details
-                match_details['contact'] = contact_info
-                
-                # Save to history
-                conn = get_db_connection()
-                cursor = conn.cursor()
-                cursor.execute(
-                    'INSERT INTO resume_history (user_id, filename, job_title, match_score) VALUES (?, ?, ?, ?)',
-                    (current_user.id, filename, job_desc[:100], match_score)
-                )
-                conn.commit()
-                
-                file_result.update({
-                    'success': True,
-                    'match_score': match_score,
-                    'details': match_details,
-                    'resume_id': cursor.lastrowid,
-                    'contact_info': contact_info,  # Add contact information to the response
-                    'name': contact_info.get('name', 'Name not found'),
-                    'email': contact_info.get('email', 'N/A'),
-                    'phone': contact_info.get('phone', 'N/A')
-                })
-                
-                logger.info(f"Processed {filename}. Match score: {match_score}")
-                
-            except Exception as e:
-                logger.error(f"Error processing file {filename}: {str(e)}", exc_info=True)
-                file_result['error'] = f'Error processing file: {str(e)}'
-                
-            finally:
-                # Clean up the uploaded file
-                if os.path.exists(filepath):
-                    try:
-                        os.remove(filepath)
-                        logger.info(f"Temporary file {filepath} removed")
-                    except Exception as e:
-                        logger.error(f"Error removing file {filepath}: {str(e)}")
-                
-                results.append(file_result)
+        uploads = [(file.filename, file.read()) for file in files]
+        # Admin-requested profiles keep the files on this thread so the profile shows the
+        # work. Sampled requests stay on the pool, so sampling does not serialize uploads;
+        # their profiles show the request thread waiting on it.
+        inline = g.get('profile_reason') == 'requested'
+        stream_format = request.values.get('stream', '').lower()
+        if stream_format in ('ndjson', 'sse'):
+            return stream_upload_results(uploads, job_desc, cache_key, top_k, stream_format, start_time, inline)
+        
+        results = process_uploads(uploads, job_desc, cache_key, top_k, inline)
+        
+        # Save to history in a single transaction
+        save_results_history(get_db_connection(), current_user.id, job_desc, results)
+        UPLOAD_REQUEST_SECONDS.observe(time.perf_counter() - start_time, mode='sync')
         
         # Return all results
         return jsonify({
@@ -271,6 +572,96 @@ def upload_resume():
             'details': str(e)
         }), 500
 
+@app.route('/api/profiles')
+@login_required
+def list_profiles():
+    """List saved request profiles (admins only)"""
+    if not profiling.is_admin(current_user):
+        return jsonify({'error': 'Admin access required'}), 403
+    return jsonify({'profiles': profiling.list_profiles(limit=request.args.get('limit', 50, type=int))})
+
+@app.route('/api/profiles/<profile_id>')
+@login_required
+def download_profile(profile_id):
+    """
+    Download a saved request profile (admins only)
+    
+    Returns the raw cProfile stats for pstats/snakeviz, or a text report sorted by
+    ?sort= (default cumulative) with format=text.
+    """
+    if not profiling.is_admin(current_user):
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    if request.args.get('format') == 'text':
+        try:
+            report = profiling.render_profile(
+                profile_id, sort=request.args.get('sort', 'cumulative'), limit=request.args.get('limit', 50, type=int)
+            )
+        except KeyError:
+            return jsonify({'error': 'Invalid sort key'}), 400
+        if report is None:
+            return jsonify({'error': 'Profile not found'}), 404
+        return Response(report, mimetype='text/plain')
+    
+    path = profiling.get_profile_path(profile_id)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=f'{profile_id}.prof')
+
+@app.route('/api/jobs')
+@login_required
+def list_jobs():
+    """List the current user's upload jobs"""
+    limit = request.args.get('limit', 20, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    return jsonify({'jobs': job_queue.list(current_user.id, limit=limit, offset=offset)})
+
+@app.route('/api/jobs/<job_id>')
+@login_required
+def get_job(job_id):
+    """Report the progress of an upload job and the results of its finished files"""
+    job = job_queue.get(job_id, current_user.id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/rank-resumes', methods=['POST'])
+@login_required
+def rank_resumes():
+    """Rank the caller's uploaded resumes and the public resume pool against a job description"""
+    data = request.get_json(silent=True) or {}
+    conn = get_db_connection()
+    
+    try:
+        top_n = int(data.get('top_n', 10))
+        min_score = float(data.get('min_score', 0))
+        top_k = int(data.get('top_k', ats_utils.DEFAULT_TOP_TERMS))
+        template_id = int(data['template_id']) if data.get('template_id') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_n, min_score, top_k and template_id must be numbers'}), 400
+    if not 1 <= top_k <= MAX_TOP_TERMS:
+        return jsonify({'error': f'top_k must be between 1 and {MAX_TOP_TERMS}'}), 400
+    
+    if template_id is not None:
+        job_desc = load_template_description(conn, template_id, current_user.id)
+        if job_desc is None:
+            return jsonify({'error': 'Template not found'}), 404
+    else:
+        job_desc = data.get('job_description')
+        if not job_desc:
+            return jsonify({'error': 'Job description is required'}), 400
+    
+    top_resumes = resume_store.store.rank(
+        conn, job_desc, top_n=top_n, min_score=min_score,
+        cache_key=ats_utils.job_cache_key(job_desc, template_id), top_k=top_k, user_id=current_user.id
+    )
+    
+    return jsonify({
+        'success': True,
+        'total_candidates': resume_store.store.count(conn, user_id=current_user.id),
+        'top_resumes': top_resumes
+    })
+
 @app.route('/')
 def home():
     """Serve the home page"""
@@ -291,8 +682,14 @@ def api_info():
             'GET /': 'Home page',
             'GET /screener': 'Resume screening interface',
             'GET /api/health': 'Health check',
+            'GET /api/metrics': 'Metrics in Prometheus text format',
+            'GET /api/profiles': 'List saved request profiles (admins)',
+            'GET /api/profiles/<profile_id>': 'Download a request profile (admins)',
             'GET /api/info': 'API information',
-            'POST /api/upload': 'Upload resume for screening'
+            'POST /api/upload': 'Upload resume for screening (async=true to queue as a job, stream=ndjson|sse to stream results)',
+            'GET /api/jobs': 'List upload jobs',
+            'GET /api/jobs/<job_id>': 'Upload job progress and results',
+            'POST /api/rank-resumes': 'Rank all stored resumes against a job description'
         }
     })
 
@@ -321,11 +718,7 @@ def register():
             conn.commit()
             
             # Log the registration
-            cursor.execute(
-                'INSERT INTO analytics (user_id, action, details) VALUES (?, ?, ?)',
-                (user_id, 'register', json.dumps({'username': username, 'email': email}))
-            )
-            conn.commit()
+            db.analytics.record(user_id, 'register', json.dumps({'username': username, 'email': email}))
             
             # Log the user in
             user = User(user_id, username, email)
@@ -343,8 +736,6 @@ def register():
         except sqlite3.IntegrityError as e:
             conn.rollback()
             return jsonify({'error': 'Username or email already exists'}), 400
-        finally:
-            conn.close()
     
     return render_template('register.html')
 
@@ -362,12 +753,7 @@ def login():
             
             if user and check_password_hash(user['password_hash'], password):
                 # Log the login
-                conn.execute(
-                    'INSERT INTO analytics (user_id, action) VALUES (?, ?)',
-                    (user['id'], 'login')
-                )
-                conn.commit()
-                conn.close()
+                db.analytics.record(user['id'], 'login')
                 
                 user_obj = User(user['id'], user['username'], user['email'])
                 login_user(user_obj)
@@ -382,7 +768,6 @@ def login():
                     'redirect': request.args.get('next', '/')
                 })
             
-            conn.close()
             return jsonify({'error': 'Invalid username or password'}), 401
         else:
             # Handle form submission from the login page
@@ -394,12 +779,7 @@ def login():
             
             if user and check_password_hash(user['password_hash'], password):
                 # Log the login
-                conn.execute(
-                    'INSERT INTO analytics (user_id, action) VALUES (?, ?)',
-                    (user['id'], 'login')
-                )
-                conn.commit()
-                conn.close()
+                db.analytics.record(user['id'], 'login')
                 
                 user_obj = User(user['id'], user['username'], user['email'])
                 login_user(user_obj)
@@ -407,7 +787,6 @@ def login():
                 next_page = request.args.get('next')
                 return redirect(next_page) if next_page else redirect(url_for('index'))
             
-            conn.close()
             flash('Invalid username or password', 'error')
     
     # For GET requests or failed login attempts, show the login page
@@ -417,13 +796,7 @@ def login():
 @login_required
 def logout():
     # Log the logout
-    conn = get_db_connection()
-    conn.execute(
-        'INSERT INTO analytics (user_id, action) VALUES (?, ?)',
-        (current_user.id, 'logout')
-    )
-    conn.commit()
-    conn.close()
+    db.analytics.record(current_user.id, 'logout')
     
     logout_user()
     return redirect(url_for('home'))
@@ -451,12 +824,7 @@ def templates():
         conn.commit()
         
         # Log the template creation
-        conn.execute(
-            'INSERT INTO analytics (user_id, action, details) VALUES (?, ?, ?)',
-            (current_user.id, 'template_created', json.dumps({'template_id': template_id, 'title': title}))
-        )
-        conn.commit()
-        conn.close()
+        db.analytics.record(current_user.id, 'template_created', json.dumps({'template_id': template_id, 'title': title}))
         
         return jsonify({
             'message': 'Template created successfully',
@@ -479,7 +847,6 @@ def templates():
         ).fetchall()
     
     templates_list = [dict(template) for template in templates]
-    conn.close()
     
     return jsonify(templates_list)
 
@@ -501,8 +868,6 @@ def get_history():
         (current_user.id,)
     ).fetchone()['count']
     
-    conn.close()
-    
     return jsonify({
         'items': [dict(item) for item in history],
         'total': total,
@@ -516,6 +881,8 @@ def get_history():
 def get_analytics():
     time_range = request.args.get('range', '7d')  # 7d, 30d, 90d, all
     
+    # Include events still waiting in the write buffer
+    db.analytics.flush()
     conn = get_db_connection()
     
     # Get activity summary
@@ -545,8 +912,6 @@ def get_analytics():
     
     actions = conn.execute(actions_query, (current_user.id,)).fetchall()
     
-    conn.close()
-    
     return jsonify({
         'activity': [dict(item) for item in activity],
         'actions': [dict(item) for item in actions]
@@ -592,6 +957,7 @@ def export_data(data_type):
         )
     
     elif data_type == 'analytics':
+        db.analytics.flush()
         data = conn.execute(
             'SELECT * FROM analytics WHERE user_id = ?',
             (current_user.id,)
@@ -1,62 +1,97 @@
-import re
 import os
-import PyPDF2
+import io
+import time
+import uuid
+import hashlib
+import joblib
 from docx import Document
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from collections import namedtuple
 import numpy as np
+import text_cache
+import memory_cache
+import text_normalizer
+import pdf_extractors
+import extraction_guard
+from extraction_guard import ExtractionError
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF file with improved error handling"""
-    text = ""
-    try:
-        with open(pdf_path, 'rb') as file:
-            try:
-                reader = PyPDF2.PdfReader(file)
-                if not reader.pages:
-                    print(f"Warning: No pages found in PDF: {pdf_path}")
-                    return ""
-                
-                for page in reader.pages:
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                        else:
-                            print(f"Warning: No text extracted from a page in {pdf_path}")
-                    except Exception as page_error:
-                        print(f"Error extracting text from a page in {pdf_path}: {str(page_error)}")
-                        continue
-                        
-            except PyPDF2.errors.PdfReadError as pdf_error:
-                print(f"Error reading PDF {pdf_path}: {str(pdf_error)}"
-                      " - The PDF might be corrupted or encrypted.")
-                return ""
-                
-    except Exception as e:
-        print(f"Error opening/reading file {pdf_path}: {str(e)}")
-        return ""
-        
-    if not text.strip():
-        print(f"Warning: No text could be extracted from {pdf_path}")
-        
-    return text
+# Location of the corpus-fitted TF-IDF model
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.environ.get('ATS_MODEL_DIR') or os.path.join(BASE_DIR, 'models')
+TFIDF_MODEL_PATH = os.path.join(MODEL_DIR, 'tfidf_vectorizer.joblib')
+DEFAULT_CORPUS_DIR = os.path.join(BASE_DIR, '..', 'dataset', 'data', 'data')
+
+# PDF backend chain (PDF_BACKENDS) and extractor identifiers used as part of the text cache key
+_pdf_chain = pdf_extractors.get_chain()
+PDF_EXTRACTOR = pdf_extractors.chain_id(_pdf_chain)
+DOCX_EXTRACTOR = 'python-docx'
+
+# Bump whenever preprocessing or vectorizer settings change so stale models are ignored
+MODEL_VERSION = 2
+
+# Fitted vectorizer shared by all scoring calls (loaded once per process)
+_vectorizer = None
+_vectorizer_loaded = False
+_feature_names = None
+_model_id = None
 
-def extract_text_from_docx(docx_path):
-    """Extract text from DOCX file"""
+# Processed job descriptions, their vectors and important terms, reused across requests
+JD_CACHE_MAX_BYTES = int(os.environ.get('JD_CACHE_MAX_BYTES') or 32 * 1024 * 1024)
+_jd_cache = memory_cache.MemoryLRUCache(JD_CACHE_MAX_BYTES)
+
+# Number of job description terms reported as important by default
+DEFAULT_TOP_TERMS = 10
+
+JobProfile = namedtuple('JobProfile', ['processed', 'vector', 'important_terms'])
+
+def _describe(source, name=None):
+    """Name used for a resume source in log messages"""
+    if name:
+        return name
+    return source if isinstance(source, (str, os.PathLike)) else '<uploaded file>'
+
+def extract_text_from_pdf(source, name=None, max_pages=None, max_chars=None, mode=None, stats=None):
+    """
+    Extract text from PDF file with the configured backend chain (see pdf_extractors)
+    
+    Extraction stops after max_pages pages or max_chars characters. In 'parallel'
+    mode, long files are split into page ranges extracted across a process pool
+    (only outside the extraction guard, see pdf_extractors.PDF_EXTRACTION_MODE).
+    
+    Args:
+        source: Path to the PDF, its raw bytes, or a binary file object
+        name: Optional display name used in log messages
+        max_pages: Maximum pages to extract (0 for no limit, default PDF_MAX_PAGES)
+        max_chars: Maximum characters to return (0 for no limit, default PDF_MAX_CHARS)
+        mode: 'serial' or 'parallel' (default PDF_EXTRACTION_MODE)
+        stats: Optional dictionary that receives the backend used, page counts and timing
+    """
+    return pdf_extractors.extract_text(
+        source, name, chain=_pdf_chain, max_pages=max_pages, max_chars=max_chars, mode=mode, stats=stats
+    )
+
+def extract_text_from_docx(source, name=None, stats=None):
+    """Extract text from DOCX file given its path, raw bytes or a binary file object"""
     try:
-        doc = Document(docx_path)
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        doc = Document(source)
         return "\n".join([paragraph.text for paragraph in doc.paragraphs])
     except Exception as e:
-        print(f"Error reading DOCX file {docx_path}: {str(e)}")
+        print(f"Error reading DOCX file {_describe(source, name)}: {str(e)}")
         return ""
 
-def parse_resume(filepath):
+def parse_resume(source, filename=None, stats=None):
     """
     Parse resume file and extract text content with validation
     
     Args:
-        filepath (str): Path to the resume file
+        source: Path to the resume file, or its contents as bytes or a binary
+            file object (e.g. an upload stream)
+        filename (str): Original file name, required when source is not a path
+            so the format can be determined
+        stats (dict): Optional dictionary that receives extraction timing, page
+            counts and whether the text came from the cache
         
     Returns:
         str: Extracted text from the resume
@@ -65,93 +100,387 @@ def parse_resume(filepath):
         FileNotFoundError: If the file doesn't exist
         ValueError: If the file is empty, corrupted, or in an unsupported format
     """
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"File not found: {filepath}")
+    if isinstance(source, (str, os.PathLike)):
+        filepath = os.fspath(source)
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"File not found: {filepath}")
+            
+        if os.path.getsize(filepath) == 0:
+            raise ValueError(f"File is empty: {filepath}")
         
-    if os.path.getsize(filepath) == 0:
-        raise ValueError(f"File is empty: {filepath}")
+        filename = filename or filepath
+    else:
+        if filename is None:
+            raise ValueError("A filename is required when parsing resume contents")
+        # Read streams once so the bytes can be hashed and parsed without touching disk
+        if hasattr(source, 'read'):
+            source = source.read()
+        if not source:
+            raise ValueError(f"File is empty: {filename}")
+    
+    _, ext = os.path.splitext(filename.lower())
+    stats = {} if stats is None else stats
+    stats['cached'] = True
+    start_time = time.perf_counter()
     
-    _, ext = os.path.splitext(filepath.lower())
-    ext = ext.lower()
+    def guarded(extract_fn):
+        # Extract in a supervised child process with a time and memory limit
+        def extract(data):
+            stats['cached'] = False
+            text, extract_stats = extraction_guard.run(_extract_with_stats, extract_fn, data, filename, label=filename)
+            stats.update(extract_stats)
+            return text
+        return extract
     
     try:
         if ext == '.pdf':
-            text = extract_text_from_pdf(filepath)
+            text = text_cache.cached_extract(source, guarded(extract_text_from_pdf), PDF_EXTRACTOR)
         elif ext in ['.docx', '.doc']:
-            text = extract_text_from_docx(filepath)
+            text = text_cache.cached_extract(source, guarded(extract_text_from_docx), DOCX_EXTRACTOR)
         else:
             raise ValueError(f"Unsupported file format: {ext}")
+        stats['total_seconds'] = round(time.perf_counter() - start_time, 4)
             
         if not text or not text.strip():
-            raise ValueError(f"No text could be extracted from the file: {filepath}")
+            raise ValueError(f"No text could be extracted from the file: {filename}")
             
         return text
         
+    except ExtractionError as e:
+        print(f"Error parsing resume {filename}: {str(e)}")
+        raise
     except Exception as e:
         # Log the full error for debugging
-        print(f"Error parsing resume {filepath}: {str(e)}")
+        print(f"Error parsing resume {filename}: {str(e)}")
         raise ValueError(f"Failed to parse resume: {str(e)}")
 
+def extractor_id(filename):
+    """
+    Id of the extractor configuration that parse_resume uses for a file type
+    
+    Text extracted under a different id (e.g. after PDF_BACKENDS, PDF_MAX_PAGES or
+    PDF_MAX_CHARS changed) should not be reused. Returns None for unsupported types.
+    """
+    _, ext = os.path.splitext(filename.lower())
+    if ext == '.pdf':
+        return PDF_EXTRACTOR
+    if ext in ['.docx', '.doc']:
+        return DOCX_EXTRACTOR
+    return None
+
+def _extract_with_stats(extract_fn, source, name):
+    """Run an extractor and return its text along with the stats it recorded"""
+    stats = {}
+    text = extract_fn(source, name, stats=stats)
+    return text, stats
+
+def extract_contact_info(resume_text):
+    """Basic contact extraction from the first lines of a resume"""
+    # For now, use basic contact extraction from the raw text
+    # In a real implementation, you'd use a proper resume parser
+    contact_info = {
+        'name': 'Unknown',
+        'email': 'Not found',
+        'phone': 'Not found'
+    }
+    
+    # Simple contact extraction (very basic)
+    lines = resume_text.split('\n')
+    for line in lines[:5]:  # Check first 5 lines
+        line = line.strip()
+        if '@' in line and '.' in line and ' ' not in line.strip():
+            contact_info['email'] = line.strip()
+        elif any(char.isdigit() for char in line) and len(line) > 8:
+            contact_info['phone'] = line.strip()
+        elif len(line.split()) <= 3 and len(line) > 2 and not any(char.isdigit() for char in line):
+            contact_info['name'] = line.strip()
+    
+    return contact_info
+
 def preprocess_text(text):
     """Preprocess text by converting to lowercase and removing special characters"""
-    if not text:
-        return ""
-    # Convert to lowercase and remove special characters
-    text = text.lower()
-    text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text)
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    return text
-
-def calculate_match_score(resume_text, job_description):
-    """Calculate match score between resume and job description using TF-IDF and cosine similarity"""
-    # Preprocess texts
-    resume_processed = preprocess_text(resume_text)
-    job_desc_processed = preprocess_text(job_description)
+    return text_normalizer.normalize(text)
+
+def create_vectorizer(min_df=1, max_df=1.0):
+    """Create the TF-IDF vectorizer used for resume scoring (expects preprocessed text)"""
+    return TfidfVectorizer(analyzer=text_normalizer.TokenAnalyzer(), min_df=min_df, max_df=max_df)
+
+def fit_vectorizer(texts, min_df=2, max_df=0.95):
+    """
+    Fit a TF-IDF vectorizer over a corpus of resume texts
     
-    if not resume_processed or not job_desc_processed:
-        return 0.0, {}
+    Args:
+        texts: Iterable of raw resume texts
+        min_df: Minimum document frequency for a term to be kept
+        max_df: Maximum document frequency (as a fraction) for a term to be kept
+        
+    Returns:
+        TfidfVectorizer: The fitted vectorizer
+        
+    Raises:
+        ValueError: If the corpus contains no usable text
+    """
+    documents = [preprocess_text(text) for text in texts]
+    documents = [doc for doc in documents if doc]
+    if not documents:
+        raise ValueError("Cannot fit TF-IDF model on an empty corpus")
+    
+    # Small corpora cannot satisfy the document frequency limits
+    if len(documents) < 10:
+        min_df, max_df = 1, 1.0
+    
+    vectorizer = create_vectorizer(min_df=min_df, max_df=max_df)
+    vectorizer.fit(documents)
+    return vectorizer
+
+def save_vectorizer(vectorizer, model_path=TFIDF_MODEL_PATH, n_documents=None):
+    """
+    Persist a fitted vectorizer to disk
+    
+    Returns:
+        str: Unique id of the saved model, used to tell when stored vectors are stale
+    """
+    directory = os.path.dirname(model_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    model_id = uuid.uuid4().hex
+    joblib.dump({
+        'version': MODEL_VERSION,
+        'model_id': model_id,
+        'vectorizer': vectorizer,
+        'n_documents': n_documents,
+        'fitted_at': time.strftime("%Y-%m-%d %H:%M:%S")
+    }, model_path)
+    return model_id
+
+def load_vectorizer(model_path=TFIDF_MODEL_PATH):
+    """
+    Load the corpus-fitted vectorizer from disk and make it the active scoring model
+    
+    Returns:
+        TfidfVectorizer or None: The loaded vectorizer, or None if no usable model exists
+    """
+    global _vectorizer, _vectorizer_loaded, _feature_names, _model_id
+    _vectorizer_loaded = True
+    _vectorizer = None
+    _feature_names = None
+    _model_id = None
+    _jd_cache.clear()
+    
+    if not os.path.exists(model_path):
+        return None
     
-    # Create TF-IDF vectors
-    vectorizer = TfidfVectorizer(stop_words='english')
     try:
-        tfidf_matrix = vectorizer.fit_transform([resume_processed, job_desc_processed])
-    except ValueError:
+        payload = joblib.load(model_path)
+    except Exception as e:
+        print(f"Error loading TF-IDF model {model_path}: {str(e)}")
+        return None
+    
+    if not isinstance(payload, dict) or payload.get('version') != MODEL_VERSION:
+        print(f"Warning: Ignoring outdated TF-IDF model at {model_path}, please rebuild it")
+        return None
+    
+    _vectorizer = payload['vectorizer']
+    _feature_names = _vectorizer.get_feature_names_out()
+    _model_id = payload.get('model_id') or payload.get('fitted_at')
+    return _vectorizer
+
+def set_vectorizer(vectorizer, model_id=None):
+    """Use the given fitted vectorizer for scoring (None reverts to per-pair fitting)"""
+    global _vectorizer, _vectorizer_loaded, _feature_names, _model_id
+    _vectorizer = vectorizer
+    _vectorizer_loaded = True
+    _feature_names = vectorizer.get_feature_names_out() if vectorizer is not None else None
+    _model_id = (model_id or uuid.uuid4().hex) if vectorizer is not None else None
+    _jd_cache.clear()
+
+def get_model_id():
+    """Return the id of the active model, or None when scoring fits per request"""
+    get_vectorizer()
+    return _model_id
+
+def get_vectorizer():
+    """Return the active corpus-fitted vectorizer, loading it on first use"""
+    if not _vectorizer_loaded:
+        load_vectorizer()
+    return _vectorizer
+
+def get_feature_names(vectorizer):
+    """Return the vocabulary of a fitted vectorizer, reusing the cached copy for the active model"""
+    if vectorizer is _vectorizer and _feature_names is not None:
+        return _feature_names
+    return vectorizer.get_feature_names_out()
+
+def find_resume_files(directory, extensions=('.pdf', '.docx')):
+    """Recursively list resume files under a directory in a stable order"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.lower().endswith(extensions):
+                paths.append(os.path.join(root, file))
+    return sorted(paths)
+
+def build_corpus_model(corpus_dir=DEFAULT_CORPUS_DIR, model_path=TFIDF_MODEL_PATH, limit=None):
+    """
+    Fit the TF-IDF model over every resume in a directory and save it to disk
+    
+    Args:
+        corpus_dir: Directory containing resume files (searched recursively)
+        model_path: Where to save the fitted model
+        limit: Optional maximum number of files to use
+        
+    Returns:
+        TfidfVectorizer: The fitted vectorizer, which also becomes the active model
+    """
+    paths = find_resume_files(corpus_dir)
+    if limit:
+        paths = paths[:limit]
+    
+    texts = []
+    for path in paths:
+        try:
+            texts.append(parse_resume(path))
+        except (FileNotFoundError, ValueError):
+            continue
+    
+    vectorizer = fit_vectorizer(texts)
+    model_id = save_vectorizer(vectorizer, model_path, n_documents=len(texts))
+    set_vectorizer(vectorizer, model_id)
+    return vectorizer
+
+def job_cache_key(job_description, template_id=None):
+    """Cache key of a job description: its template id, or a hash of its normalized text"""
+    if template_id is not None:
+        return f'template:{template_id}'
+    normalized = ' '.join(job_description.lower().split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def get_job_profile(job_description, cache_key=None, top_k=DEFAULT_TOP_TERMS):
+    """
+    Return the processed text, vector and important terms of a job description
+    
+    Profiles are cached per model, so repeated requisitions skip preprocessing and
+    vectorizing the description. Requires a fitted model.
+    
+    Args:
+        job_description: Job description text
+        cache_key: Optional key from job_cache_key(); defaults to the hash of the text
+        top_k: Number of important terms to keep
+        
+    Returns:
+        JobProfile, or None if no model is loaded
+    """
+    vectorizer = get_vectorizer()
+    if vectorizer is None:
+        return None
+    key = (get_model_id(), cache_key or job_cache_key(job_description), top_k)
+    profile = _jd_cache.get(key)
+    if profile is not None:
+        return profile
+    
+    processed = preprocess_text(job_description)
+    vector = vectorizer.transform([processed])
+    important_terms = get_important_terms(vector, get_feature_names(vectorizer), top_k)
+    profile = JobProfile(processed, vector, important_terms)
+    size = len(processed) + memory_cache.sparse_nbytes(vector) + sum(len(term) for term in important_terms)
+    _jd_cache.put(key, profile, size)
+    return profile
+
+def get_jd_cache_stats():
+    """Return hit, miss and eviction statistics of the job description cache"""
+    return _jd_cache.stats()
+
+def calculate_match_score(resume_text, job_description, cache_key=None, top_k=DEFAULT_TOP_TERMS):
+    """
+    Calculate match score between resume and job description using TF-IDF and cosine similarity
+    
+    Args:
+        resume_text: Extracted resume text
+        job_description: Job description text
+        cache_key: Optional job description cache key (see job_cache_key)
+        top_k: Number of important job description terms to report
+    """
+    # Preprocess texts
+    resume_processed = preprocess_text(resume_text)
+    if not resume_processed or not job_description:
         return 0.0, {}
     
-    # Calculate cosine similarity
-    similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
-    match_score = float(similarity[0][0]) * 100  # Convert to percentage
+    # Score with the corpus-fitted model and the cached job description profile,
+    # falling back to fitting on the pair itself when no model has been built yet
+    profile = get_job_profile(job_description, cache_key, top_k)
+    if profile is not None:
+        if not profile.processed:
+            return 0.0, {}
+        resume_vector = get_vectorizer().transform([resume_processed])
+        job_vector = profile.vector
+        important_terms = profile.important_terms
+    else:
+        job_desc_processed = preprocess_text(job_description)
+        if not job_desc_processed:
+            return 0.0, {}
+        vectorizer = create_vectorizer()
+        try:
+            tfidf_matrix = vectorizer.fit_transform([resume_processed, job_desc_processed])
+        except ValueError:
+            return 0.0, {}
+        resume_vector, job_vector = tfidf_matrix[0:1], tfidf_matrix[1:2]
+        # Get the top important terms from job description
+        important_terms = get_important_terms(job_vector, get_feature_names(vectorizer), top_k)
     
-    # Get feature importance (top matching terms)
-    feature_names = vectorizer.get_feature_names_out()
-    tfidf_scores = tfidf_matrix.toarray()
+    # Vectors are L2-normalised, so the dot product is the cosine similarity
+    similarity = (resume_vector @ job_vector.T).toarray()[0][0]
+    match_score = float(similarity) * 100  # Convert to percentage
     
-    # Get top 10 important terms from job description
-    top_terms_indices = np.argsort(tfidf_scores[1])[-10:][::-1]
-    important_terms = [feature_names[i] for i in top_terms_indices if tfidf_scores[1][i] > 0]
+    match_details = build_match_details(match_score, important_terms, resume_processed)
     
-    # Check for presence of important terms in resume
-    present_terms = [term for term in important_terms if term in resume_processed]
+    return match_score, match_details
+
+def get_important_terms(job_vector, feature_names, top_k=DEFAULT_TOP_TERMS):
+    """Return the highest weighted terms of a single-row TF-IDF vector"""
+    # Select from the stored non-zero weights only, without densifying the row
+    job_vector = job_vector.tocsr()
+    weights = job_vector.data
+    top = top_k_indices(weights, top_k)
+    return [feature_names[job_vector.indices[i]] for i in top if weights[i] > 0]
+
+def build_match_details(match_score, important_terms, resume_processed):
+    """Build the match details reported for a scored resume"""
+    # Count whole-token occurrences of each important term, so that e.g. "java"
+    # does not match inside "javascript"
+    max_n = max((term.count(' ') + 1 for term in important_terms), default=1)
+    counts = text_normalizer.ngram_counts(resume_processed.split(), max_n)
+    term_hits = {term: counts[term] for term in important_terms}
+    present_terms = [term for term in important_terms if term_hits[term]]
     
-    # Prepare match details
-    match_details = {
+    return {
         'important_terms': important_terms,
         'matched_terms': present_terms,
         'match_percentage': min(round(match_score, 2), 100.0),  # Cap at 100%
-        'missing_terms': [term for term in important_terms if term not in present_terms]
+        'missing_terms': [term for term in important_terms if not term_hits[term]],
+        'term_hits': term_hits
     }
-    
-    return match_score, match_details
 
-def rank_resumes(resumes, job_description, top_n=5):
+def top_k_indices(scores, k):
+    """Return the indices of the k largest scores in descending order"""
+    if k is None or k >= len(scores):
+        return np.argsort(scores, kind='stable')[::-1]
+    if k <= 0:
+        return np.array([], dtype=int)
+    candidates = np.argpartition(scores, -k)[-k:]
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+def rank_resumes(resumes, job_description, top_n=5, top_k=DEFAULT_TOP_TERMS):
     """
     Rank resumes based on their match with the job description
     
+    All resumes are transformed into a single sparse matrix and scored against
+    the job description with one matrix-vector product.
+    
     Args:
         resumes: List of dictionaries with 'id' and 'text' keys
         job_description: Job description text
         top_n: Number of top resumes to return
+        top_k: Number of important job description terms to report
         
     Returns:
         List of dictionaries with 'id', 'score', and 'details' keys, sorted by score
@@ -159,18 +488,76 @@ def rank_resumes(resumes, job_description, top_n=5):
     if not resumes or not job_description:
         return []
     
-    scored_resumes = []
-    for resume in resumes:
-        score, details = calculate_match_score(resume.get('text', ''), job_description)
-        scored_resumes.append({
+    profile = get_job_profile(job_description, top_k=top_k)
+    if profile is not None and not profile.processed:
+        return []
+    
+    resume_docs = [preprocess_text(resume.get('text', '')) for resume in resumes]
+    
+    try:
+        if profile is not None:
+            resume_matrix = get_vectorizer().transform(resume_docs)
+            job_vector = profile.vector
+            important_terms = profile.important_terms
+        else:
+            job_desc_processed = preprocess_text(job_description)
+            if not job_desc_processed:
+                return []
+            # Without a corpus model, the resumes being ranked are the corpus
+            vectorizer = create_vectorizer()
+            vectorizer.fit(resume_docs + [job_desc_processed])
+            resume_matrix = vectorizer.transform(resume_docs)
+            job_vector = vectorizer.transform([job_desc_processed])
+            important_terms = get_important_terms(job_vector, get_feature_names(vectorizer), top_k)
+    except ValueError:
+        return []
+    
+    # Rows are L2-normalised, so the dot product is the cosine similarity
+    scores = (resume_matrix @ job_vector.T).toarray().ravel() * 100
+    
+    ranked = []
+    for i in top_k_indices(scores, top_n):
+        score = float(scores[i])
+        resume = resumes[i]
+        ranked.append({
             'id': resume.get('id'),
             'filename': resume.get('filename', ''),
             'score': score,
-            'details': details
+            'details': build_match_details(score, important_terms, resume_docs[i]) if resume_docs[i] else {}
         })
     
-    # Sort by score in descending order
-    scored_resumes.sort(key=lambda x: x['score'], reverse=True)
+    return ranked
+
+def score_matrix(resume_texts, job_descriptions):
+    """
+    Score every resume against every job description
+    
+    Resumes and job descriptions are each transformed once and all scores are
+    computed with a single sparse matrix product.
+    
+    Args:
+        resume_texts: List of raw resume texts
+        job_descriptions: List of job description texts
+        
+    Returns:
+        numpy.ndarray: Array of shape (len(resume_texts), len(job_descriptions))
+        holding match percentages
+    """
+    scores = np.zeros((len(resume_texts), len(job_descriptions)))
+    if not resume_texts or not job_descriptions:
+        return scores
+    
+    resume_docs = [preprocess_text(text) for text in resume_texts]
+    job_docs = [preprocess_text(text) for text in job_descriptions]
+    
+    vectorizer = get_vectorizer()
+    try:
+        if vectorizer is None:
+            vectorizer = create_vectorizer()
+            vectorizer.fit(resume_docs + job_docs)
+        resume_matrix = vectorizer.transform(resume_docs)
+        job_matrix = vectorizer.transform(job_docs)
+    except ValueError:
+        return scores
     
-    # Return top N resumes
-    return scored_resumes[:top_n]
+    return (resume_matrix @ job_matrix.T).toarray() * 100
@@ -0,0 +1,118 @@
+# Offline Batch Scoring
+# Scores a directory of resumes against one or more job descriptions in-process,
+# without going through the HTTP API, and writes all scores to a single table.
+import os
+import csv
+import json
+import time
+import argparse
+import concurrent.futures
+from pathlib import Path
+from tqdm import tqdm
+import ats_utils
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ats_config.json')
+
+def _extract(path):
+    """Extract text from one resume, returning an error message instead of raising"""
+    try:
+        return ats_utils.parse_resume(path), None
+    except Exception as e:
+        return '', str(e)
+
+def extract_resumes(paths, max_workers=None):
+    """
+    Extract text from resume files in parallel across processes
+    
+    Returns:
+        list: One dictionary per file with 'filename', 'category', 'path', 'text' and 'error'
+    """
+    resumes = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        extracted = executor.map(_extract, paths, chunksize=16)
+        for path, (text, error) in tqdm(zip(paths, extracted), total=len(paths), desc="Extracting", unit="file"):
+            resumes.append({
+                'filename': os.path.basename(path),
+                'category': os.path.basename(os.path.dirname(path)),
+                'path': path,
+                'text': text,
+                'error': error
+            })
+    return resumes
+
+def score_resumes(resumes, job_descriptions):
+    """
+    Score extracted resumes against named job descriptions
+    
+    Args:
+        resumes: List of dictionaries from extract_resumes
+        job_descriptions: Dictionary mapping a job name to its description
+        
+    Returns:
+        list: One row per resume with a 'score_<job name>' column for every job
+    """
+    names = list(job_descriptions)
+    scores = ats_utils.score_matrix([r['text'] for r in resumes], [job_descriptions[n] for n in names])
+    
+    rows = []
+    for i, resume in enumerate(resumes):
+        row = {
+            'filename': resume['filename'],
+            'category': resume['category'],
+            'path': resume['path'],
+            'text_length': len(resume['text']),
+            'error': resume['error'] or ''
+        }
+        for j, name in enumerate(names):
+            row[f'score_{name}'] = round(float(scores[i, j]), 2)
+        rows.append(row)
+    return rows
+
+def write_results(rows, output_path):
+    """Write scored rows to CSV, or to Parquet when the output path ends in .parquet"""
+    if not rows:
+        print("No results to save.")
+        return
+    
+    if output_path.lower().endswith('.parquet'):
+        import pandas as pd  # Parquet output also needs pyarrow or fastparquet
+        pd.DataFrame(rows).to_parquet(output_path, index=False)
+        return
+    
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def load_job_descriptions(job_files):
+    """Load job descriptions from text files, defaulting to the one in ats_config.json"""
+    if job_files:
+        return {Path(path).stem: Path(path).read_text(encoding='utf-8') for path in job_files}
+    
+    with open(CONFIG_FILE, 'r') as f:
+        return {'default': json.load(f)['job_description']}
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a directory of resumes offline against job descriptions')
+    parser.add_argument('--dataset-dir', default=ats_utils.DEFAULT_CORPUS_DIR, help='Directory containing resume files')
+    parser.add_argument('--job', action='append', dest='jobs', help='Job description text file (repeatable)')
+    parser.add_argument('--output', default='batch_scores.csv', help='Output file (.csv or .parquet)')
+    parser.add_argument('--workers', type=int, default=None, help='Number of extraction processes')
+    
+    args = parser.parse_args()
+    
+    job_descriptions = load_job_descriptions(args.jobs)
+    paths = ats_utils.find_resume_files(args.dataset_dir)
+    print(f"Scoring {len(paths)} resumes against {len(job_descriptions)} job description(s)...")
+    
+    start_time = time.time()
+    resumes = extract_resumes(paths, max_workers=args.workers)
+    rows = score_resumes(resumes, job_descriptions)
+    write_results(rows, args.output)
+    
+    failed = sum(1 for row in rows if row['error'])
+    print(f"Scored {len(rows) - failed} resumes ({failed} failed) in {time.time() - start_time:.1f}s")
+    print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# Benchmark Runner
+# Times the extraction and scoring hot paths on the bundled resume dataset and
+# writes the results as JSON, so runs can be compared between releases.
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+import ats_utils
+import batch_score
+
+STAGES = ('extraction', 'preprocess', 'score', 'rank', 'upload')
+DEFAULT_SIZES = (10, 100, 1000, 2500)
+
+JOB_DESCRIPTION = (
+    "We are looking for a senior accountant with experience in general ledger, "
+    "account reconciliations, financial reporting, tax preparation, budgeting and "
+    "auditing. Proficiency in Excel, QuickBooks and SAP is required, along with "
+    "strong communication skills and knowledge of GAAP."
+)
+
+def summarize(samples):
+    """Summary statistics of a list of durations in seconds, reported in milliseconds"""
+    values = np.array(samples) * 1000
+    if not len(values):
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'total_ms': round(float(values.sum()), 3),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'max_ms': round(float(values.max()), 3)
+    }
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return its result along with the elapsed seconds"""
+    start_time = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+def bench_extraction(paths):
+    """Per-file PDF extraction, bypassing the text cache and the extraction guard"""
+    samples = []
+    pages = 0
+    for path in paths:
+        stats = {}
+        _, seconds = timed(ats_utils.extract_text_from_pdf, path, stats=stats)
+        samples.append(seconds)
+        pages += stats.get('pages_extracted', 0)
+    result = summarize(samples)
+    result['files_per_second'] = round(len(paths) / sum(samples), 2) if samples else None
+    result['pages'] = pages
+    return result
+
+def bench_preprocess(texts, repeat):
+    """preprocess_text over every resume text"""
+    samples = [timed(ats_utils.preprocess_text, text)[1] for _ in range(repeat) for text in texts]
+    result = summarize(samples)
+    result['chars'] = sum(len(text) for text in texts)
+    return result
+
+def bench_score(texts, repeat):
+    """calculate_match_score of each resume against the benchmark job description"""
+    samples = [timed(ats_utils.calculate_match_score, text, JOB_DESCRIPTION)[1] for _ in range(repeat) for text in texts]
+    return summarize(samples)
+
+def bench_rank(texts, sizes, repeat):
+    """rank_resumes over pools of increasing size"""
+    results = {}
+    for size in sizes:
+        pool = [{'id': i, 'text': text} for i, text in enumerate(texts[:size])]
+        samples = [timed(ats_utils.rank_resumes, pool, JOB_DESCRIPTION, top_n=10)[1] for _ in range(repeat)]
+        results[str(size)] = dict(summarize(samples), resumes=len(pool))
+    return results
+
+def bench_upload(paths, requests, files_per_request, workdir, model=None):
+    """End-to-end /api/upload through Flask's test client against a scratch database"""
+    # The app reads its database and cache locations at import time
+    os.environ['RESUME_SCREENER_DB'] = os.path.join(workdir, 'benchmark.db')
+    os.environ['RESUME_TEXT_CACHE'] = os.path.join(workdir, 'upload_cache.db')
+    import text_cache
+    text_cache.set_cache_path(os.environ['RESUME_TEXT_CACHE'])
+    import app as app_module
+    if model:
+        # Importing the app loads its default model
+        ats_utils.load_vectorizer(model)
+
+    app_module.init_db()
+    client = app_module.app.test_client()
+    client.post('/register', json={'username': 'benchmark', 'email': 'benchmark@example.com', 'password': 'benchmark'})
+
+    samples = []
+    files = 0
+    for request_number in range(requests):
+        batch = paths[request_number * files_per_request:(request_number + 1) * files_per_request]
+        if not batch:
+            break
+        data = {
+            'job_description': JOB_DESCRIPTION,
+            'resume': [(io.BytesIO(open(path, 'rb').read()), os.path.basename(path)) for path in batch]
+        }
+        response, seconds = timed(client.post, '/api/upload', data=data, content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/upload returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        samples.append(seconds)
+        files += len(batch)
+    result = summarize(samples)
+    result['files'] = files
+    result['files_per_second'] = round(files / sum(samples), 2) if samples else None
+    return result
+
+def git_commit():
+    """Current commit of the repository, if available"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    paths = ats_utils.find_resume_files(args.dataset_dir, extensions=('.pdf',))
+    if not paths:
+        raise SystemExit(f"No PDFs found in {args.dataset_dir}")
+    # A fixed seed keeps the selected files the same between runs
+    random.Random(args.seed).shuffle(paths)
+    stages = args.stages.split(',') if args.stages else STAGES
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    if args.model:
+        ats_utils.load_vectorizer(args.model)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'dataset_files': len(paths),
+        'pdf_extractor': ats_utils.PDF_EXTRACTOR,
+        'model_id': ats_utils.get_model_id(),
+        'stages': {}
+    }
+
+    if 'extraction' in stages:
+        print(f"Extracting {args.extract_files} PDFs...", file=sys.stderr)
+        results['stages']['extraction'] = bench_extraction(paths[:args.extract_files])
+
+    if any(stage in stages for stage in ('preprocess', 'score', 'rank')):
+        # Texts come through the regular text cache, so only the first run pays for extraction
+        corpus_size = max(sizes) if 'rank' in stages else args.score_files
+        print(f"Loading {corpus_size} resumes...", file=sys.stderr)
+        resumes = batch_score.extract_resumes(paths[:corpus_size], max_workers=args.workers)
+        texts = [resume['text'] for resume in resumes if resume['text']]
+
+        if 'preprocess' in stages:
+            results['stages']['preprocess'] = bench_preprocess(texts[:args.score_files], args.repeat)
+        if 'score' in stages:
+            results['stages']['score'] = bench_score(texts[:args.score_files], args.repeat)
+        if 'rank' in stages:
+            results['stages']['rank'] = bench_rank(texts, sizes, args.repeat)
+
+    if 'upload' in stages:
+        print("Benchmarking /api/upload...", file=sys.stderr)
+        workdir = tempfile.mkdtemp(prefix='resume-benchmark-')
+        try:
+            results['stages']['upload'] = bench_upload(
+                paths, args.upload_requests, args.files_per_request, workdir, model=args.model
+            )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extraction and scoring on the resume dataset')
+    parser.add_argument('--dataset-dir', default=ats_utils.DEFAULT_CORPUS_DIR, help='Directory containing resume files')
+    parser.add_argument('--stages', default=None, help=f'Comma-separated stages to run (default: {",".join(STAGES)})')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES), help='Pool sizes for rank_resumes')
+    parser.add_argument('--extract-files', type=int, default=50, help='PDFs to time per-file extraction on')
+    parser.add_argument('--score-files', type=int, default=200, help='Resumes to preprocess and score')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions of the in-memory stages')
+    parser.add_argument('--upload-requests', type=int, default=10, help='Number of /api/upload requests')
+    parser.add_argument('--files-per-request', type=int, default=5, help='Resumes per /api/upload request')
+    parser.add_argument('--workers', type=int, default=None, help='Processes used to load the corpus')
+    parser.add_argument('--model', default=None, help='TF-IDF model to load (default: the app model, if built)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the file selection')
+    parser.add_argument('--output', default=None, help='Write the JSON results to this file instead of stdout')
+
+    args = parser.parse_args()
+    results = run(args)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import time
+import ats_utils
+import pdf_extractors
+
+def benchmark_backends(paths, names=None):
+    """
+    Extract every PDF with each backend on its own, bypassing the text cache
+
+    Args:
+        paths: PDF file paths
+        names: Backend names to compare (default: every registered backend)
+
+    Returns:
+        dict: Per-backend file count, timing, throughput, empty results and characters extracted
+    """
+    results = {}
+    for name in names or pdf_extractors.available_backends():
+        chain = pdf_extractors.get_chain([name])
+        empty = 0
+        chars = 0
+        start_time = time.perf_counter()
+        for path in paths:
+            text = pdf_extractors.extract_text(path, chain=chain)
+            if text.strip():
+                chars += len(text)
+            else:
+                empty += 1
+        seconds = time.perf_counter() - start_time
+        results[name] = {
+            'version': chain[0].version,
+            'files': len(paths),
+            'seconds': round(seconds, 3),
+            'files_per_second': round(len(paths) / seconds, 2) if seconds else None,
+            'empty': empty,
+            'chars': chars
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare PDF extraction backends on a resume dataset')
+    parser.add_argument('--dataset-dir', default=ats_utils.DEFAULT_CORPUS_DIR, help='Directory containing resume files')
+    parser.add_argument('--limit', type=int, default=200, help='Maximum number of PDFs to extract (0 for all)')
+    parser.add_argument('--backends', default=None, help='Comma-separated backends to compare (default: all available)')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    args = parser.parse_args()
+
+    paths = ats_utils.find_resume_files(args.dataset_dir, extensions=('.pdf',))
+    if args.limit:
+        paths = paths[:args.limit]
+    names = args.backends.split(',') if args.backends else None
+
+    results = benchmark_backends(paths, names)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Extracted {len(paths)} PDFs from {args.dataset_dir}")
+    print(f"{'Backend':<12}{'Seconds':>10}{'Files/s':>10}{'Empty':>8}{'Chars':>12}")
+    for name, result in sorted(results.items(), key=lambda item: item[1]['seconds']):
+        print(f"{name:<12}{result['seconds']:>10}{result['files_per_second']:>10}{result['empty']:>8}{result['chars']:>12}")
+
+if __name__ == "__main__":
+    main()
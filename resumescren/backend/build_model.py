@@ -0,0 +1,30 @@
+import argparse
+import time
+import ats_utils
+import job_matcher
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit the ATS TF-IDF model over a resume corpus')
+    parser.add_argument('--dataset-dir', default=ats_utils.DEFAULT_CORPUS_DIR, help='Directory containing resume files')
+    parser.add_argument('--output', default=ats_utils.TFIDF_MODEL_PATH, help='Where to save the fitted model')
+    parser.add_argument('--limit', type=int, default=None, help='Maximum number of resumes to use')
+    
+    args = parser.parse_args()
+    
+    print(f"Fitting TF-IDF model on resumes in {args.dataset_dir}...")
+    start_time = time.time()
+    vectorizer = ats_utils.build_corpus_model(args.dataset_dir, args.output, limit=args.limit)
+    
+    print(f"Vocabulary size: {len(vectorizer.vocabulary_)}")
+    print(f"Model saved to {args.output} in {time.time() - start_time:.1f}s")
+    
+    # Extracted text is cached by now, so the bigram model only pays for fitting
+    print("Fitting job matcher bigram model...")
+    start_time = time.time()
+    vectorizer = job_matcher.build_corpus_model(args.dataset_dir, limit=args.limit)
+    
+    print(f"Vocabulary size: {len(vectorizer.vocabulary_)}")
+    print(f"Model saved to {job_matcher.MODEL_PATH} in {time.time() - start_time:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Database Connection Layer
+# Pooled SQLite connections tuned for concurrent request handling. Each request
+# borrows one connection for its whole app context and returns it on teardown.
+import os
+import queue
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+from flask import g
+
+DATABASE = os.environ.get('RESUME_SCREENER_DB') or 'resume_screener.db'
+
+BUSY_TIMEOUT_SECONDS = 30
+POOL_SIZE = 16
+# Statements kept prepared per connection, so repeated queries skip re-parsing
+STATEMENT_CACHE_SIZE = 256
+
+# Buffered analytics events are written once this many are queued or the oldest is this old
+ANALYTICS_FLUSH_SIZE = 50
+ANALYTICS_FLUSH_SECONDS = 5.0
+
+def connect(path=None):
+    """Open a new connection with WAL journaling and the app's pragmas applied"""
+    conn = sqlite3.connect(
+        path or DATABASE,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    # WAL makes NORMAL durable against application crashes while skipping most fsyncs
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_SECONDS * 1000}')
+    return conn
+
+class ConnectionPool:
+    """Thread-safe pool of reusable SQLite connections"""
+
+    def __init__(self, path=None, max_size=POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=max_size)
+
+    def acquire(self):
+        """Borrow an idle connection, opening a new one if none is available"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return connect(self.path)
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+pool = ConnectionPool()
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection outside of a request, e.g. from a background thread"""
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+def get_db():
+    """Return the connection for the current app context, borrowing one from the pool on first use"""
+    if 'db' not in g:
+        g.db = pool.acquire()
+    return g.db
+
+def close_db(exception=None):
+    """Return the app context's connection to the pool"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        pool.release(conn)
+
+def init_app(app):
+    """Release pooled connections when each app context is torn down"""
+    app.teardown_appcontext(close_db)
+
+class AnalyticsBuffer:
+    """Queue of analytics events written in batches with a single executemany and commit"""
+
+    def __init__(self, max_size=ANALYTICS_FLUSH_SIZE, max_age=ANALYTICS_FLUSH_SECONDS):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._events = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def record(self, user_id, action, details=None):
+        """Queue an analytics event, flushing when the buffer is full"""
+        with self._lock:
+            self._events.append((user_id, action, details))
+            full = len(self._events) >= self.max_size
+            if not full and self._timer is None:
+                # Make sure a quiet period still gets the event written
+                self._timer = threading.Timer(self.max_age, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write all queued events in one transaction and return how many were written"""
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return 0
+
+        try:
+            with connection() as conn, conn:
+                conn.executemany(
+                    'INSERT INTO analytics (user_id, action, details) VALUES (?, ?, ?)',
+                    events
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing analytics events: {str(e)}")
+            return 0
+        return len(events)
+
+analytics = AnalyticsBuffer()
+atexit.register(analytics.flush)
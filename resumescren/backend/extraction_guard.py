@@ -0,0 +1,162 @@
+# Extraction Guard
+# Runs text extraction in a short-lived child process with a wall-clock timeout
+# and an address space ceiling, so a malformed or adversarial file fails on its
+# own instead of pinning the worker that is processing it.
+import os
+import sys
+import time
+import signal
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Set EXTRACTION_GUARD=0 to extract in-process (e.g. for debugging)
+GUARD_ENABLED = (os.environ.get('EXTRACTION_GUARD') or '1') != '0'
+TIMEOUT_SECONDS = float(os.environ.get('EXTRACTION_TIMEOUT_SECONDS') or 30)
+# Address space the child may allocate on top of what it inherits from the parent
+MEMORY_LIMIT_MB = int(os.environ.get('EXTRACTION_MEMORY_LIMIT_MB') or 1024)
+
+# Set in the guard's child process
+_in_child = False
+
+class ExtractionError(ValueError):
+    """
+    Extraction was stopped by the guard (a ValueError, like other unreadable files)
+
+    Attributes:
+        code: 'timeout', 'memory_limit' or 'crashed'
+    """
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+    def __reduce__(self):
+        return (ExtractionError, (self.code, str(self)))
+
+    def to_dict(self):
+        return {'code': self.code, 'message': str(self)}
+
+def _address_space_bytes():
+    """Current virtual memory size of this process, or None if unknown"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+def _reopen_stdio():
+    """
+    Give the child fresh stdout/stderr objects on the same descriptors
+
+    The child is forked from a threaded server: another thread may have held the
+    lock of sys.stdout (e.g. mid-print) at fork time, and that lock stays taken
+    in the child. The old objects are still referenced from sys.__stdout__ and
+    sys.__stderr__, so they are never flushed or closed here.
+    """
+    for name in ('stdout', 'stderr'):
+        stream = getattr(sys, name)
+        try:
+            fd = stream.fileno()
+        except (AttributeError, OSError, ValueError):
+            continue
+        encoding = getattr(stream, 'encoding', None) or 'utf-8'
+        setattr(sys, name, open(fd, 'w', buffering=1, encoding=encoding, errors='backslashreplace', closefd=False))
+
+def in_child():
+    """True inside a guarded child process"""
+    return _in_child
+
+def _child(conn, fn, args, memory_limit_mb):
+    global _in_child
+    _in_child = True
+    _reopen_stdio()
+    # Lead a new process group, so stopping the child also stops any workers it
+    # starts (e.g. a process pool)
+    if hasattr(os, 'setpgid'):
+        os.setpgid(0, 0)
+    if resource is not None and memory_limit_mb:
+        current = _address_space_bytes() or 0
+        limit = current + memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        conn.send(('ok', fn(*args)))
+    except MemoryError:
+        conn.send(('memory_limit', f'Extraction exceeded the {memory_limit_mb}MB memory limit'))
+    except Exception as e:
+        conn.send(('error', e))
+    finally:
+        conn.close()
+
+def _kill_group(pid):
+    """Kill whatever is left of a child's process group"""
+    if not hasattr(os, 'killpg'):
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def _get_context():
+    # Forking skips re-importing the app in the child; elsewhere fall back to the default
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+def run(fn, *args, timeout=None, memory_limit_mb=None, label=None):
+    """
+    Call fn(*args) in a supervised child process and return its result
+
+    Exceptions raised by fn are re-raised in the caller. With the guard disabled,
+    or inside a daemonic process (which cannot have children), fn runs in-process.
+    The child is not daemonic, so fn may start processes of its own; they are
+    stopped together with the child.
+
+    Args:
+        fn: Function to run; it and its result must be picklable unless forking
+        timeout: Wall-clock limit in seconds (default TIMEOUT_SECONDS)
+        memory_limit_mb: Extra address space allowed in the child (default MEMORY_LIMIT_MB)
+        label: Name used in error messages
+
+    Raises:
+        ExtractionError: If the child timed out, ran out of memory or died
+    """
+    if not GUARD_ENABLED or multiprocessing.current_process().daemon:
+        return fn(*args)
+    timeout = TIMEOUT_SECONDS if timeout is None else timeout
+    memory_limit_mb = MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+    label = label or 'file'
+
+    context = _get_context()
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(child_conn, fn, args, memory_limit_mb))
+    process.start()
+    child_conn.close()
+
+    deadline = time.monotonic() + timeout
+    try:
+        # Read before joining so a large result cannot block the child on a full pipe
+        if not parent_conn.poll(max(deadline - time.monotonic(), 0)):
+            process.kill()
+            raise ExtractionError('timeout', f'Extraction of {label} timed out after {timeout:g}s')
+        try:
+            status, payload = parent_conn.recv()
+        except EOFError:
+            process.join(timeout=1)
+            raise ExtractionError('crashed', f'Extraction of {label} crashed (exit code {process.exitcode})')
+    finally:
+        parent_conn.close()
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        _kill_group(process.pid)
+
+    if status == 'ok':
+        return payload
+    if status == 'memory_limit':
+        raise ExtractionError('memory_limit', f'{payload} while reading {label}')
+    raise payload
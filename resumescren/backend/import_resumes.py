@@ -0,0 +1,45 @@
+import os
+import argparse
+from tqdm import tqdm
+import ats_utils
+import db
+import resume_store
+import text_cache
+
+def import_directory(conn, directory):
+    """Extract every resume in a directory and add it to the resume store, visible to every user"""
+    added = skipped = failed = 0
+    for path in tqdm(ats_utils.find_resume_files(directory), desc="Importing Resumes", unit="file"):
+        with open(path, 'rb') as f:
+            content = f.read()
+        try:
+            text = ats_utils.parse_resume(content, filename=os.path.basename(path))
+        except ValueError:
+            failed += 1
+            continue
+        
+        contact = ats_utils.extract_contact_info(text)
+        if resume_store.store.add(conn, text_cache.hash_content(content), os.path.basename(path), text, contact,
+                                  public=True, extractor=ats_utils.extractor_id(path)):
+            added += 1
+        else:
+            skipped += 1
+    return added, skipped, failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Add a directory of resumes to the ranking store')
+    parser.add_argument('--dataset-dir', default=ats_utils.DEFAULT_CORPUS_DIR, help='Directory containing resume files')
+    
+    args = parser.parse_args()
+    
+    conn = db.connect()
+    with conn:
+        resume_store.init_schema(conn)
+    
+    added, skipped, failed = import_directory(conn, args.dataset_dir)
+    print(f"Added {added} resumes ({skipped} already stored, {failed} failed)")
+    print(f"Store now holds {resume_store.store.count(conn)} resumes")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,95 @@
 # Job Matcher Module
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-import re
+import hashlib
+import joblib
+import os
 import time
 from functools import lru_cache
+import ats_utils
+import memory_cache
+import text_normalizer
 
-# Pre-compile regex patterns for text cleaning
-CLEAN_PATTERN = re.compile(r'[^a-zA-Z\s]')
+# Corpus-fitted bigram model, built with build_model.py
+MODEL_PATH = os.path.join(ats_utils.MODEL_DIR, 'job_matcher_bigram.joblib')
+MODEL_VERSION = 2
 
-@lru_cache(maxsize=100)  # Cache vectorizer results for common job descriptions
-def get_vectorizer():
+# Memory budget for cached job description vectors
+JD_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+def create_vectorizer(min_df=2, max_df=0.8):
     return TfidfVectorizer(
-        stop_words='english',
-        ngram_range=(1, 2),  # Consider both unigrams and bigrams
+        analyzer=text_normalizer.TokenAnalyzer(ngram_range=(1, 2)),  # Unigrams and bigrams of cleaned text
         max_features=5000,    # Limit number of features
-        min_df=2,            # Ignore terms that appear in only 1 document
-        max_df=0.8,          # Ignore terms that appear in more than 80% of documents
+        min_df=min_df,       # Ignore terms that appear in fewer documents
+        max_df=max_df,       # Ignore terms that appear in more than this share of documents
         use_idf=True,
         smooth_idf=True
     )
 
+def fit_model(texts, model_path=MODEL_PATH):
+    """Fit the bigram model over a corpus of resume texts and save it"""
+    documents = [doc for doc in (clean_text(text) for text in texts) if doc]
+    if not documents:
+        raise ValueError("Cannot fit job matcher model on an empty corpus")
+
+    # Small corpora cannot satisfy the document frequency limits
+    vectorizer = create_vectorizer() if len(documents) >= 10 else create_vectorizer(min_df=1, max_df=1.0)
+    vectorizer.fit(documents)
+
+    directory = os.path.dirname(model_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    joblib.dump({'version': MODEL_VERSION, 'vectorizer': vectorizer}, model_path)
+
+    get_vectorizer.cache_clear()
+    _jd_cache.clear()
+    return vectorizer
+
+def build_corpus_model(corpus_dir=ats_utils.DEFAULT_CORPUS_DIR, model_path=MODEL_PATH, limit=None):
+    """Fit the bigram model over every resume in a directory"""
+    paths = ats_utils.find_resume_files(corpus_dir)
+    if limit:
+        paths = paths[:limit]
+
+    texts = []
+    for path in paths:
+        try:
+            texts.append(ats_utils.parse_resume(path))
+        except (FileNotFoundError, ValueError):
+            continue
+    return fit_model(texts, model_path)
+
+@lru_cache(maxsize=1)  # Load the fitted model once per process
+def get_vectorizer(model_path=MODEL_PATH):
+    """Return the corpus-fitted bigram vectorizer, or None if no model has been built"""
+    if not os.path.exists(model_path):
+        return None
+    try:
+        payload = joblib.load(model_path)
+    except Exception as e:
+        print(f"Error loading job matcher model {model_path}: {str(e)}")
+        return None
+    if not isinstance(payload, dict) or payload.get('version') != MODEL_VERSION:
+        print(f"Warning: Ignoring outdated job matcher model at {model_path}, please rebuild it")
+        return None
+    return payload['vectorizer']
+
+_jd_cache = memory_cache.MemoryLRUCache(JD_CACHE_MAX_BYTES)
+
+def get_job_vector(job_desc, vectorizer):
+    """Return the vector of a cleaned job description, cached by the hash of its text"""
+    key = hashlib.sha256(job_desc.encode('utf-8')).hexdigest()
+    vector = _jd_cache.get(key)
+    if vector is None:
+        vector = vectorizer.transform([job_desc])
+        _jd_cache.put(key, vector, memory_cache.sparse_nbytes(vector))
+    return vector
+
 def clean_text(text):
     """Basic text cleaning"""
-    if not text:
-        return ""
-    # Convert to lowercase and remove special characters
-    text = text.lower()
-    text = CLEAN_PATTERN.sub(' ', text)
-    # Remove extra whitespace
-    return ' '.join(text.split())
+    # Lowercase, letters only, single spaces
+    return text_normalizer.normalize(text, keep_digits=False)
 
 def match_resume_to_job(resume_data, job_description):
     start_time = time.time()
@@ -42,15 +102,20 @@ def match_resume_to_job(resume_data, job_description):
         return 0.0, {'error': 'Missing resume text or job description'}
     
     try:
-        # Initialize vectorizer with optimized parameters
         vectorizer = get_vectorizer()
         
-        # Transform the texts
-        texts = [resume_text, job_desc]
-        tfidf = vectorizer.fit_transform(texts)
+        if vectorizer is not None:
+            # Transform only; the job description vector is reused across calls
+            resume_vector = vectorizer.transform([resume_text])
+            job_vector = get_job_vector(job_desc, vectorizer)
+        else:
+            # No corpus model yet: fit on the pair itself, without document frequency limits
+            pair_vectorizer = create_vectorizer(min_df=1, max_df=1.0)
+            tfidf = pair_vectorizer.fit_transform([resume_text, job_desc])
+            resume_vector, job_vector = tfidf[0:1], tfidf[1:2]
         
-        # Calculate similarity
-        score = cosine_similarity(tfidf[0:1], tfidf[1:2])[0][0]
+        # Vectors are L2-normalised, so the dot product is the cosine similarity
+        score = (resume_vector @ job_vector.T).toarray()[0][0]
         
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -0,0 +1,70 @@
+# Memory-Bounded LRU Cache
+import threading
+from collections import OrderedDict
+
+class MemoryLRUCache:
+    """
+    Thread-safe LRU cache bounded by the approximate size of its entries
+
+    Callers pass the size of each value when storing it; the least recently used
+    entries are evicted once the total exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if it is not cached"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, size):
+        """Store a value, evicting least recently used entries to stay within max_bytes"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (statistics are kept)"""
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit, miss and eviction counts along with the current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+def sparse_nbytes(matrix):
+    """Approximate memory used by a scipy CSR matrix"""
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
@@ -0,0 +1,160 @@
+# In-Process Metrics
+# Counters and histograms collected in memory and rendered in the Prometheus
+# text exposition format by /api/metrics. Values are per process.
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels"""
+
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _format_labels(self.labelnames, key), value) for key, value in sorted(self._values.items())]
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 3)
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with block in seconds"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                samples.append((f'{self.name}_bucket', labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f'{self.name}_sum', labels, state[-2]))
+            samples.append((f'{self.name}_count', labels, state[-1]))
+        return samples
+
+class Registry:
+    """Set of metrics plus collector callbacks for values computed at scrape time"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collect_fn):
+        """
+        Add a callback run on every scrape
+
+        collect_fn returns a list of (name, type, documentation, value) tuples,
+        rendered as unlabelled samples.
+        """
+        with self._lock:
+            self._collectors.append(collect_fn)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        for collect_fn in collectors:
+            try:
+                collected = collect_fn()
+            except Exception as e:
+                print(f"Error collecting metrics: {str(e)}")
+                continue
+            for name, metric_type, documentation, value in collected:
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                lines.append(f'{name} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+def counter(name, documentation, labelnames=()):
+    """Create and register a counter"""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """Create and register a histogram"""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+def register_collector(collect_fn):
+    """Add a scrape-time collector to the default registry (see Registry.register_collector)"""
+    REGISTRY.register_collector(collect_fn)
+
+def render():
+    """Render the default registry in the Prometheus text exposition format"""
+    return REGISTRY.render()
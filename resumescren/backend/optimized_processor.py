@@ -3,7 +3,10 @@ import json
 import time
 import hashlib
 import concurrent.futures
+import multiprocessing
 import argparse
+from collections import deque
+from functools import partial
 from pathlib import Path
 from tqdm import tqdm
 import requests
@@ -81,30 +84,104 @@ def process_resume(file_path, use_cache=True):
     except Exception as e:
         return {"error": str(e), "file": str(file_path), "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
 
-def process_batch(batch_files, progress_bar=None):
-    """Process a batch of files"""
-    results = {}
-    for file_path in batch_files:
+def score_resume_locally(file_path, job_description):
+    """Extract and score a single resume in-process, mirroring the /api/upload result"""
+    import ats_utils  # Imported lazily so API mode does not need the scoring stack
+    
+    file_path = Path(file_path)
+    try:
+        resume_text = ats_utils.parse_resume(str(file_path))
+        match_score, match_details = ats_utils.calculate_match_score(resume_text, job_description)
+        result = {
+            'filename': file_path.name,
+            'success': True,
+            'match_score': match_score,
+            'details': match_details
+        }
+    except Exception as e:
+        result = {'filename': file_path.name, 'error': str(e)}
+    
+    result['file_hash'] = get_file_hash(file_path)
+    return result
+
+def _init_local_worker():
+    """Load the scoring model once per worker process"""
+    import ats_utils
+    ats_utils.get_vectorizer()
+
+def _run_and_record_start(fn, file_path, key, start_times):
+    """Worker entry point: note when the call actually starts, then run it"""
+    start_times[key] = time.monotonic()
+    return fn(file_path)
+
+def _wait_for_result(future, key, start_times, file_timeout, poll_interval=0.05):
+    """Wait for a result, counting file_timeout from when the call started rather than when it was queued"""
+    while True:
+        started_at = start_times.get(key)
+        if started_at is not None:
+            return future.result(timeout=max(0.0, started_at + file_timeout - time.monotonic()))
+        if future.done():
+            return future.result()
+        concurrent.futures.wait([future], timeout=poll_interval)
+
+def iter_results(executor, fn, files, max_in_flight, file_timeout=None):
+    """
+    Run fn over files on an executor, yielding (file, result) in input order
+    
+    At most max_in_flight files are submitted at a time, so memory stays bounded
+    however large the dataset is. A file whose result is not ready within
+    file_timeout seconds of its call starting yields an error result with
+    'timed_out' set instead; time spent queued behind other files does not count.
+    """
+    if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+        # Start times are written by the worker processes
+        with multiprocessing.Manager() as manager:
+            yield from _iter_results(executor, fn, files, max_in_flight, file_timeout, manager.dict())
+    else:
+        yield from _iter_results(executor, fn, files, max_in_flight, file_timeout, {})
+
+def _iter_results(executor, fn, files, max_in_flight, file_timeout, start_times):
+    pending = deque()
+    files = iter(enumerate(files))
+    
+    def submit_next():
+        for key, file_path in files:
+            pending.append((key, file_path, executor.submit(_run_and_record_start, fn, file_path, key, start_times)))
+            return
+    
+    for _ in range(max_in_flight):
+        submit_next()
+    
+    while pending:
+        key, file_path, future = pending.popleft()
         try:
-            result = process_resume(file_path)
-            results[str(file_path)] = result
-            
-            # Save individual result
-            result_file = os.path.join(OUTPUT_DIR, f"{Path(file_path).stem}_result.json")
-            with open(result_file, 'w') as f:
-                json.dump(result, f, indent=2)
-                
-            if progress_bar:
-                progress_bar.update(1)
-                
+            if file_timeout is None:
+                result = future.result()
+            else:
+                result = _wait_for_result(future, key, start_times, file_timeout)
+        except concurrent.futures.TimeoutError:
+            # Worker processes cannot be interrupted; the slot frees up once the call returns
+            future.cancel()
+            result = {"error": f"Timed out after {file_timeout}s", "timed_out": True, "file": str(file_path),
+                      "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
         except Exception as e:
-            print(f"\nError processing {file_path}: {str(e)}")
-            continue
-            
-    return results
+            result = {"error": str(e), "file": str(file_path), "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
+        start_times.pop(key, None)
+        
+        submit_next()
+        yield file_path, result
 
-def process_dataset(batch_size=50, max_workers=4):
-    """Process all resumes in the dataset directory with parallel processing"""
+def process_dataset(batch_size=50, max_workers=4, mode='api', file_timeout=60):
+    """
+    Process all resumes in the dataset directory with parallel processing
+    
+    Args:
+        batch_size: Maximum number of files in flight at once
+        max_workers: Number of parallel workers
+        mode: 'api' uploads files to the server from a thread pool, 'local' extracts
+              and scores them in a process pool without going through the server
+        file_timeout: Seconds allowed per file before it is reported as timed out
+    """
     # Create output directory if it doesn't exist
     Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
     
@@ -127,19 +204,30 @@ def process_dataset(batch_size=50, max_workers=4):
         
     print(f"Processing {len(files_to_process)} new files...")
     
+    if mode == 'local':
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_init_local_worker)
+        worker_fn = partial(score_resume_locally, job_description=JOB_DESCRIPTION)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        worker_fn = process_resume
+    
     results = {}
-    total_files = len(files_to_process)
-    
-    # Create progress bar
-    with tqdm(total=total_files, desc="Processing Resumes", unit="file") as pbar:
-        # Process in batches
-        for i in range(0, len(files_to_process), batch_size):
-            batch = files_to_process[i:i + batch_size]
-            batch_results = process_batch(batch, progress_bar=pbar)
-            results.update(batch_results)
+    
+    with executor, tqdm(total=len(files_to_process), desc="Processing Resumes", unit="file") as pbar:
+        for file_path, result in iter_results(executor, worker_fn, files_to_process,
+                                              max_in_flight=max(batch_size, max_workers),
+                                              file_timeout=file_timeout):
+            results[str(file_path)] = result
+            pbar.update(1)
+            
+            # Timeouts are not saved, so the file is retried on the next run
+            if result.get('timed_out'):
+                continue
             
-            # Small delay between batches to prevent overwhelming the system
-            time.sleep(1)
+            # Save individual result
+            result_file = os.path.join(OUTPUT_DIR, f"{Path(file_path).stem}_result.json")
+            with open(result_file, 'w') as f:
+                json.dump(result, f, indent=2)
     
     return results
 
@@ -220,18 +308,22 @@ def analyze_results():
 if __name__ == "__main__":
     # Set up argument parsing
     parser = argparse.ArgumentParser(description='Process resumes with ATS')
-    parser.add_argument('--batch-size', type=int, default=50, help='Number of files to process in each batch')
-    parser.add_argument('--workers', type=int, default=4, help='Number of parallel workers')
+    parser.add_argument('--batch-size', type=int, default=50, help='Maximum number of files in flight at once')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help='Number of parallel workers')
+    parser.add_argument('--mode', choices=['api', 'local'], default='api',
+                        help="'api' uploads to the server, 'local' extracts and scores in a process pool")
+    parser.add_argument('--file-timeout', type=float, default=60.0, help='Seconds allowed per file')
     parser.add_argument('--min-score', type=float, default=70.0, help='Minimum match score to consider')
     parser.add_argument('--top-n', type=int, default=10, help='Number of top matches to show')
     
     args = parser.parse_args()
     
     print("Starting optimized resume processing...")
-    print(f"Configuration: {args.workers} workers, batch size {args.batch_size}")
+    print(f"Configuration: {args.mode} mode, {args.workers} workers, batch size {args.batch_size}")
     
     # Process the dataset
-    process_dataset(batch_size=args.batch_size, max_workers=args.workers)
+    process_dataset(batch_size=args.batch_size, max_workers=args.workers,
+                    mode=args.mode, file_timeout=args.file_timeout)
     
     # Analyze and show results
     analyze_results()
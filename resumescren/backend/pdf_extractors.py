@@ -0,0 +1,300 @@
+# PDF Extraction Backends
+# Registry of PDF text extractors. A deployment picks an ordered chain of
+# backends with PDF_BACKENDS; each file is extracted by the first backend in
+# the chain that returns text, so a fast engine can be tried before a more
+# robust one.
+import io
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import PyPDF2
+import extraction_guard
+
+try:
+    import pdfminer
+    from pdfminer.high_level import extract_text as pdfminer_extract_text
+except ImportError:
+    pdfminer = None
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+# Ordered, comma-separated backend chain; unavailable backends are skipped
+PDF_BACKENDS = os.environ.get('PDF_BACKENDS') or 'pypdf2,pdfminer'
+
+# Extraction budget and mode ('serial' or 'parallel'), to bound worst-case
+# latency on long documents. Limits of 0 disable them. Parallel mode shares one
+# page pool per process, so it only applies with EXTRACTION_GUARD=0: under the
+# guard each file is extracted in a fresh child, where starting a pool per file
+# would cost more than it saves, and extraction stays serial.
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES') or 30)
+PDF_MAX_CHARS = int(os.environ.get('PDF_MAX_CHARS') or 200000)
+PDF_EXTRACTION_MODE = os.environ.get('PDF_EXTRACTION_MODE') or 'serial'
+# Parallel mode only splits files with at least this many pages
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES') or 8)
+PDF_PAGE_WORKERS = int(os.environ.get('PDF_PAGE_WORKERS') or 4)
+
+class PdfBackend:
+    """
+    A registered PDF text extractor
+
+    Args:
+        name: Name used in PDF_BACKENDS
+        version: Engine version, part of the text cache key
+        extract_fn: Called as extract_fn(file, label, max_pages, max_chars, mode, stats)
+            with a seekable binary stream; returns the extracted text
+    """
+
+    def __init__(self, name, version, extract_fn):
+        self.name = name
+        self.version = version
+        self.extract_fn = extract_fn
+
+    @property
+    def id(self):
+        return f'{self.name}-{self.version}'
+
+_backends = {}
+
+def register_backend(name, version, extract_fn):
+    """Add a backend to the registry, replacing any backend with the same name"""
+    _backends[name] = PdfBackend(name, version, extract_fn)
+
+def available_backends():
+    """Return the names of every registered backend"""
+    return list(_backends)
+
+def get_chain(names=None):
+    """
+    Resolve a backend chain
+
+    Args:
+        names: Comma-separated string or list of backend names (default PDF_BACKENDS)
+
+    Returns:
+        list: PdfBackend objects in order, skipping names that are not registered
+    """
+    if names is None:
+        names = PDF_BACKENDS
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(',') if name.strip()]
+
+    chain = []
+    for name in names:
+        if name in _backends:
+            chain.append(_backends[name])
+        else:
+            print(f"Warning: PDF backend '{name}' is not available, skipping it")
+    if not chain:
+        raise ValueError(f"No available PDF backend in {names}; available: {available_backends()}")
+    return chain
+
+def chain_id(chain=None, max_pages=None, max_chars=None):
+    """Identifier of a backend chain and extraction budget, used as the text cache key"""
+    chain = get_chain() if chain is None else chain
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    return '+'.join(backend.id for backend in chain) + f'-p{max_pages}-c{max_chars}'
+
+def _open_source(source):
+    """Return a binary stream for a file path, raw bytes or an open file object"""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if hasattr(source, 'read'):
+        return source
+    return open(source, 'rb')
+
+def _describe(source, name=None):
+    """Name used for a PDF source in log messages"""
+    if name:
+        return name
+    return source if isinstance(source, (str, os.PathLike)) else '<uploaded file>'
+
+def extract_text(source, name=None, chain=None, max_pages=None, max_chars=None, mode=None, stats=None):
+    """
+    Extract text from a PDF with the first backend of the chain that returns any
+
+    Args:
+        source: Path to the PDF, its raw bytes, or a seekable binary file object
+        name: Optional display name used in log messages
+        chain: Backend chain from get_chain() (default PDF_BACKENDS)
+        max_pages: Maximum pages to extract (0 for no limit, default PDF_MAX_PAGES)
+        max_chars: Maximum characters to return (0 for no limit, default PDF_MAX_CHARS)
+        mode: 'serial' or 'parallel' (default PDF_EXTRACTION_MODE)
+        stats: Optional dictionary that receives the backend used, page counts and timing
+
+    Returns:
+        str: The extracted text, or an empty string if no backend found any
+    """
+    label = _describe(source, name)
+    chain = get_chain() if chain is None else chain
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    mode = mode or PDF_EXTRACTION_MODE
+    stats = {} if stats is None else stats
+    start_time = time.perf_counter()
+
+    text = ""
+    try:
+        file = _open_source(source)
+        try:
+            for position, backend in enumerate(chain):
+                if position:
+                    print(f"Warning: {chain[position - 1].name} found no text in {label}, falling back to {backend.name}")
+                    file.seek(0)
+                stats['backend'] = backend.name
+                try:
+                    text = backend.extract_fn(file, label, max_pages, max_chars, mode, stats) or ""
+                except Exception as e:
+                    print(f"Error extracting text from {label} with {backend.name}: {str(e)}")
+                    text = ""
+                if text.strip():
+                    break
+        finally:
+            if file is not source:
+                file.close()
+    except Exception as e:
+        print(f"Error opening/reading file {label}: {str(e)}")
+        return ""
+
+    truncated = bool(max_chars) and len(text) > max_chars
+    if truncated:
+        text = text[:max_chars]
+        stats['truncated'] = True
+    stats['extraction_seconds'] = round(time.perf_counter() - start_time, 4)
+
+    if not text.strip():
+        print(f"Warning: No text could be extracted from {label}")
+    return text
+
+# PyPDF2
+
+# Process pool for page-parallel extraction (created on first use, per process)
+_page_pool = None
+_page_pool_pid = None
+_page_pool_lock = threading.Lock()
+
+def _pypdf2_pages(reader, start, stop, label, max_chars=None):
+    """Extract the text of pages [start, stop) as a list, stopping once max_chars is reached"""
+    parts = []
+    chars = 0
+    for number in range(start, stop):
+        try:
+            page_text = reader.pages[number].extract_text()
+        except Exception as page_error:
+            print(f"Error extracting text from page {number + 1} in {label}: {str(page_error)}")
+            continue
+        if not page_text:
+            print(f"Warning: No text extracted from page {number + 1} in {label}")
+            continue
+        parts.append(page_text)
+        chars += len(page_text) + 1
+        if max_chars and chars >= max_chars:
+            break
+    return parts
+
+def _pypdf2_page_range(content, start, stop, label):
+    """Worker entry point: extract pages [start, stop) from the raw PDF bytes"""
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    return _pypdf2_pages(reader, start, stop, label)
+
+def _get_page_pool():
+    """Return the process pool used for page-parallel extraction, creating it on first use"""
+    global _page_pool, _page_pool_pid
+    with _page_pool_lock:
+        # A pool inherited by a forked child is not usable there
+        if _page_pool is None or _page_pool_pid != os.getpid():
+            _page_pool = ProcessPoolExecutor(max_workers=PDF_PAGE_WORKERS)
+            _page_pool_pid = os.getpid()
+        return _page_pool
+
+def _pypdf2_pages_parallel(content, page_count, label):
+    """Split the pages into one range per worker and extract them concurrently, in page order"""
+    chunk = -(-page_count // PDF_PAGE_WORKERS)
+    ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    pool = _get_page_pool()
+    futures = [pool.submit(_pypdf2_page_range, content, start, stop, label) for start, stop in ranges]
+
+    parts = []
+    for (start, stop), future in zip(ranges, futures):
+        try:
+            parts.extend(future.result())
+        except Exception as e:
+            print(f"Error extracting pages {start + 1}-{stop} of {label} in parallel: {str(e)}")
+            parts.extend(_pypdf2_pages(PyPDF2.PdfReader(io.BytesIO(content)), start, stop, label))
+    return parts
+
+def extract_with_pypdf2(file, label, max_pages, max_chars, mode, stats):
+    """PyPDF2 backend, with optional page-parallel extraction of long files"""
+    try:
+        reader = PyPDF2.PdfReader(file)
+        if not reader.pages:
+            print(f"Warning: No pages found in PDF: {label}")
+            return ""
+
+        page_count = len(reader.pages)
+        pages_to_read = min(page_count, max_pages) if max_pages else page_count
+        # Not inside the guard's child process, see PDF_EXTRACTION_MODE
+        if mode == 'parallel' and pages_to_read >= PDF_PARALLEL_MIN_PAGES and not extraction_guard.in_child():
+            file.seek(0)
+            parts = _pypdf2_pages_parallel(file.read(), pages_to_read, label)
+        else:
+            mode = 'serial'
+            parts = _pypdf2_pages(reader, 0, pages_to_read, label, max_chars)
+    except PyPDF2.errors.PdfReadError as pdf_error:
+        print(f"Error reading PDF {label}: {str(pdf_error)}"
+              " - The PDF might be corrupted or encrypted.")
+        return ""
+
+    stats.update({
+        'mode': mode,
+        'pages': page_count,
+        'pages_extracted': len(parts),
+        'truncated': pages_to_read < page_count
+    })
+    return "\n".join(parts) + "\n" if parts else ""
+
+register_backend('pypdf2', PyPDF2.__version__, extract_with_pypdf2)
+
+# pdfminer.six (optional): slower, but copes with some layouts PyPDF2 cannot read
+
+def extract_with_pdfminer(file, label, max_pages, max_chars, mode, stats):
+    """pdfminer.six backend"""
+    text = pdfminer_extract_text(file, maxpages=max_pages or 0)
+    stats.update({'mode': 'serial', 'truncated': False})
+    return text
+
+if pdfminer is not None:
+    register_backend('pdfminer', pdfminer.__version__, extract_with_pdfminer)
+
+# PyMuPDF (optional): a C engine, typically the fastest when installed
+
+def extract_with_pymupdf(file, label, max_pages, max_chars, mode, stats):
+    """PyMuPDF backend"""
+    parts = []
+    chars = 0
+    with fitz.open(stream=file.read(), filetype='pdf') as doc:
+        page_count = doc.page_count
+        pages_to_read = min(page_count, max_pages) if max_pages else page_count
+        for number in range(pages_to_read):
+            page_text = doc.load_page(number).get_text()
+            if not page_text:
+                continue
+            parts.append(page_text)
+            chars += len(page_text) + 1
+            if max_chars and chars >= max_chars:
+                break
+
+    stats.update({
+        'mode': 'serial',
+        'pages': page_count,
+        'pages_extracted': len(parts),
+        'truncated': pages_to_read < page_count
+    })
+    return "\n".join(parts) + "\n" if parts else ""
+
+if fitz is not None:
+    register_backend('pymupdf', getattr(fitz, 'VersionBind', 'unknown'), extract_with_pymupdf)
@@ -0,0 +1,192 @@
+# Request Profiling
+# Opt-in cProfile capture for individual requests. Admins can ask for a profile
+# with the X-Profile header (or ?profile=1), and a fraction of all requests can
+# be sampled with PROFILE_SAMPLE_RATE. Profiles are saved by request id and can
+# be downloaded later from /api/profiles.
+import io
+import os
+import json
+import time
+import uuid
+import random
+import pstats
+import cProfile
+import threading
+from functools import wraps
+from flask import request, g
+from flask_login import current_user
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'cache', 'profiles'
+)
+# Fraction of requests to profile without being asked (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE') or 0)
+# Usernames allowed to request profiles and download them
+ADMIN_USERS = {name.strip() for name in (os.environ.get('ADMIN_USERS') or '').split(',') if name.strip()}
+# Held while a request is profiled. Python 3.12+ allows only one active cProfile per
+# process, so overlapping profiled requests are served without a profile instead.
+_profiling = threading.Lock()
+
+def is_admin(user):
+    """True if the user may request and download profiles"""
+    return bool(getattr(user, 'is_authenticated', False)) and user.username in ADMIN_USERS
+
+def _requested():
+    flag = request.headers.get('X-Profile') or request.args.get('profile') or ''
+    return flag.lower() in ('1', 'true', 'yes')
+
+def should_profile():
+    """
+    Decide whether the current request is profiled
+
+    Returns:
+        str: 'requested' for an admin's X-Profile request, 'sampled' for a request
+        picked by PROFILE_SAMPLE_RATE, or None
+    """
+    if _requested() and is_admin(current_user):
+        return 'requested'
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return 'sampled'
+    return None
+
+def _paths(profile_id):
+    base = os.path.join(PROFILE_DIR, profile_id)
+    return base + '.prof', base + '.json'
+
+def save_profile(profiler, profile_id, metadata):
+    """Write the profile stats and their metadata to PROFILE_DIR"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stats_path, metadata_path = _paths(profile_id)
+    profiler.dump_stats(stats_path)
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f)
+
+def _profile_stream(chunks, profiler, finish):
+    """Profile the production of each chunk of a streamed response, then call finish()"""
+    iterator = iter(chunks)
+    try:
+        while True:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiling tool took over, the rest is sent unprofiled
+                yield from iterator
+                return
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                profiler.disable()
+            yield chunk
+    finally:
+        if hasattr(iterator, 'close'):
+            iterator.close()
+        finish()
+
+def profiled(view):
+    """
+    Decorator that runs a view under cProfile when should_profile() says so
+
+    Profiled responses carry an X-Profile-Id header. Streamed responses are
+    profiled until the last chunk has been produced. Only the request thread is
+    profiled; work done in extraction child processes shows up as waiting time.
+    Only one request is profiled at a time; if another profile (or another
+    profiling tool) is active, the request runs unprofiled.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        reason = should_profile()
+        if not reason or not _profiling.acquire(blocking=False):
+            return view(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler is already running in this process (Python 3.12+)
+            _profiling.release()
+            print(f"Skipping request profile: {str(e)}")
+            return view(*args, **kwargs)
+
+        profile_id = uuid.uuid4().hex
+        g.profile_id = profile_id
+        g.profile_reason = reason
+        # Collected now, streamed responses are finished outside the request context
+        metadata = {
+            'id': profile_id,
+            'path': request.path,
+            'method': request.method,
+            'user': getattr(current_user, 'username', None),
+            'sampled': reason == 'sampled'
+        }
+        start_time = time.perf_counter()
+        finished = []
+
+        def finish():
+            if finished:
+                return
+            finished.append(True)
+            _profiling.release()
+            metadata['duration_seconds'] = round(time.perf_counter() - start_time, 4)
+            metadata['created_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            try:
+                save_profile(profiler, profile_id, metadata)
+            except OSError as e:
+                print(f"Error saving profile {profile_id}: {str(e)}")
+
+        try:
+            response = view(*args, **kwargs)
+        except BaseException:
+            profiler.disable()
+            finish()
+            raise
+        profiler.disable()
+
+        # Views may return a response or a (response, status) tuple
+        target = response[0] if isinstance(response, tuple) else response
+        if getattr(target, 'is_streamed', False):
+            # The work happens while the body is sent, so the profile is saved once it is done
+            metadata['streamed'] = True
+            target.response = _profile_stream(target.response, profiler, finish)
+            # Also covers a body that is closed before it was ever iterated
+            target.call_on_close(finish)
+        else:
+            finish()
+        if hasattr(target, 'headers'):
+            target.headers['X-Profile-Id'] = profile_id
+        return response
+    return wrapper
+
+def list_profiles(limit=50):
+    """Return the metadata of the most recent profiles"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda profile: profile.get('created_at', ''), reverse=True)
+    return profiles[:limit]
+
+def get_profile_path(profile_id):
+    """Return the path of a saved profile, or None if it does not exist"""
+    # Ids are generated hex strings, anything else cannot name a profile
+    if not profile_id.isalnum():
+        return None
+    stats_path, _ = _paths(profile_id)
+    return stats_path if os.path.exists(stats_path) else None
+
+def render_profile(profile_id, sort='cumulative', limit=50):
+    """Return a text report of a saved profile, or None if it does not exist"""
+    stats_path = get_profile_path(profile_id)
+    if stats_path is None:
+        return None
+    output = io.StringIO()
+    stats = pstats.Stats(stats_path, stream=output)
+    stats.sort_stats(sort).print_stats(limit)
+    return output.getvalue()
@@ -0,0 +1,228 @@
+# Resume Inverted Index
+# Maps each token to the resumes containing it and the token positions, so
+# keyword, boolean and phrase searches never need to reparse the dataset.
+import os
+import re
+import pickle
+import threading
+from resume_parser import parse_resume
+import text_normalizer
+
+# Bump whenever tokenization changes so saved indexes are rebuilt
+INDEX_VERSION = 2
+INDEX_PATH = os.environ.get('RESUME_INDEX_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'cache', 'resume_index.pkl'
+)
+
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+def tokenize(text):
+    """Lowercase text and split it into alphanumeric tokens (see text_normalizer.tokenize)"""
+    return text_normalizer.tokenize(text)
+
+class ResumeIndex:
+    """Positional inverted index over extracted resume text"""
+
+    def __init__(self):
+        self.postings = {}   # token -> {doc_id: [positions]}
+        self.documents = {}  # doc_id -> {'path', 'filename', 'mtime', 'size', 'extract', 'tokens'}
+        self.paths = {}      # path -> doc_id
+        self.next_id = 0
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def add_document(self, path, text, mtime=None, size=None):
+        """Index (or reindex) the text of a resume"""
+        with self.lock:
+            if path in self.paths:
+                self.remove_document(path)
+
+            doc_id = self.next_id
+            self.next_id += 1
+
+            positions = {}
+            tokens = tokenize(text)
+            for position, token in enumerate(tokens):
+                positions.setdefault(token, []).append(position)
+            for token, token_positions in positions.items():
+                self.postings.setdefault(token, {})[doc_id] = token_positions
+
+            self.documents[doc_id] = {
+                'path': path,
+                'filename': os.path.basename(path),
+                'mtime': mtime,
+                'size': size,
+                'extract': text[:500].lower(),
+                'tokens': list(positions)
+            }
+            self.paths[path] = doc_id
+            return doc_id
+
+    def remove_document(self, path):
+        """Remove a resume and its postings from the index"""
+        with self.lock:
+            doc_id = self.paths.pop(path, None)
+            if doc_id is None:
+                return
+            document = self.documents.pop(doc_id)
+            for token in document['tokens']:
+                token_postings = self.postings.get(token)
+                if token_postings is None:
+                    continue
+                token_postings.pop(doc_id, None)
+                if not token_postings:
+                    del self.postings[token]
+
+    def is_current(self, path, mtime, size):
+        """Check whether a file is already indexed with the given modification time and size"""
+        doc_id = self.paths.get(path)
+        if doc_id is None:
+            return False
+        document = self.documents[doc_id]
+        return document['mtime'] == mtime and document['size'] == size
+
+    def update_from_directory(self, directory):
+        """
+        Incrementally sync the index with the PDF and DOCX files in a directory
+
+        Only new or modified files are parsed; files that no longer exist are dropped.
+
+        Returns:
+            dict: Counts of added, removed and unchanged files
+        """
+        stats = {'added': 0, 'removed': 0, 'unchanged': 0, 'failed': 0}
+        seen = set()
+
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if not file.lower().endswith(('.pdf', '.docx')):
+                    continue
+                path = os.path.join(root, file)
+                seen.add(path)
+                stat = os.stat(path)
+                if self.is_current(path, stat.st_mtime, stat.st_size):
+                    stats['unchanged'] += 1
+                    continue
+
+                parsed = parse_resume(path)
+                if 'error' in parsed:
+                    stats['failed'] += 1
+                    continue
+                self.add_document(path, parsed.get('raw_text', ''), stat.st_mtime, stat.st_size)
+                stats['added'] += 1
+
+        with self.lock:
+            for path in [p for p in self.paths if p.startswith(directory) and p not in seen]:
+                self.remove_document(path)
+                stats['removed'] += 1
+
+        return stats
+
+    def _term_docs(self, token):
+        return set(self.postings.get(token, {}))
+
+    def _phrase_docs(self, tokens):
+        if not tokens:
+            return set()
+        docs = self._term_docs(tokens[0])
+        for token in tokens[1:]:
+            docs &= self._term_docs(token)
+
+        matches = set()
+        for doc_id in docs:
+            starts = set(self.postings[tokens[0]][doc_id])
+            for offset, token in enumerate(tokens[1:], 1):
+                starts &= {p - offset for p in self.postings[token][doc_id]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc_id)
+        return matches
+
+    def search(self, query, mode='and'):
+        """
+        Search the index
+
+        Terms are combined with AND by default, or OR when mode is 'or'. The
+        keywords AND/OR inside the query override the default between two terms,
+        and double-quoted text is matched as an exact phrase.
+
+        Args:
+            query: Query string, e.g. 'python "machine learning" OR java'
+            mode: Default operator between terms ('and' or 'or')
+
+        Returns:
+            list: Matching documents as dictionaries with 'filename', 'path' and 'extract'
+        """
+        with self.lock:
+            result = None
+            operator = mode.lower()
+            for phrase, word in QUERY_PATTERN.findall(query):
+                if not phrase and word in ('AND', 'OR'):
+                    operator = word.lower()
+                    continue
+
+                tokens = tokenize(phrase or word)
+                if not tokens:
+                    continue
+                docs = self._phrase_docs(tokens) if len(tokens) > 1 else self._term_docs(tokens[0])
+
+                if result is None:
+                    result = docs
+                elif operator == 'or':
+                    result |= docs
+                else:
+                    result &= docs
+                operator = mode.lower()
+
+            if not result:
+                return []
+
+            return [
+                {
+                    'filename': self.documents[doc_id]['filename'],
+                    'path': self.documents[doc_id]['path'],
+                    'extract': self.documents[doc_id]['extract']
+                }
+                for doc_id in sorted(result, key=lambda d: self.documents[d]['path'])
+            ]
+
+    def save(self, path=INDEX_PATH):
+        """Persist the index to disk"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with self.lock:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'version': INDEX_VERSION, 'index': self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+def load_index(path=INDEX_PATH):
+    """Load a saved index, or return an empty one if none exists or it is outdated"""
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+            if payload.get('version') == INDEX_VERSION:
+                return payload['index']
+            print(f"Warning: Ignoring outdated resume index at {path}")
+        except Exception as e:
+            print(f"Error loading resume index {path}: {str(e)}")
+    return ResumeIndex()
+
+def build_index(directory, path=INDEX_PATH):
+    """Load the saved index, bring it up to date with a directory and save it"""
+    index = load_index(path)
+    stats = index.update_from_directory(directory)
+    if stats['added'] or stats['removed']:
+        index.save(path)
+    return index, stats
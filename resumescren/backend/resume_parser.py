@@ -1,15 +1,17 @@
 # Resume Parser Module
 import os
 import re
-from pdfminer.high_level import extract_text as pdf_extract
 from docx import Document
+import text_cache
+import pdf_extractors
+
+# Extractor identifiers used as part of the text cache key
+PDF_EXTRACTOR = pdf_extractors.chain_id()
+DOCX_EXTRACTOR = 'python-docx'
 
 def extract_text_from_pdf(path):
-    try:
-        return pdf_extract(path)
-    except Exception as e:
-        print(f"Error extracting text from PDF: {str(e)}")
-        return ''
+    # Uses the deployment's PDF backend chain, falling back between backends on empty text
+    return pdf_extractors.extract_text(path)
 
 def extract_text_from_docx(path):
     try:
@@ -63,9 +65,9 @@ def parse_resume(filepath):
         # Extract text based on file type
         ext = os.path.splitext(filepath)[1].lower()
         if ext == '.pdf':
-            text = extract_text_from_pdf(filepath)
+            text = text_cache.cached_extract(filepath, extract_text_from_pdf, PDF_EXTRACTOR)
         elif ext == '.docx':
-            text = extract_text_from_docx(filepath)
+            text = text_cache.cached_extract(filepath, extract_text_from_docx, DOCX_EXTRACTOR)
         else:
             return {'error': 'Unsupported file format'}
             
@@ -0,0 +1,321 @@
+# Resume Vector Store
+# Keeps every extracted resume together with its TF-IDF vector, so a new job
+# description can be ranked against the whole pool with one matrix product.
+# Uploaded resumes are only visible to the users who uploaded them (through their
+# resume_history rows); resumes added with import_resumes.py are public.
+import json
+import struct
+import threading
+import numpy as np
+from scipy import sparse
+import ats_utils
+
+def init_schema(conn):
+    """Create the store table if it does not exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS resume_store (
+            content_hash TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            text TEXT NOT NULL,
+            contact TEXT,
+            model_id TEXT,
+            vector BLOB,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_public BOOLEAN DEFAULT 0,
+            extractor TEXT
+        )
+    ''')
+    # Databases created before resumes were scoped by uploader or tagged with their extractor
+    columns = {row['name'] for row in conn.execute('PRAGMA table_info(resume_store)')}
+    for column in ('is_public BOOLEAN DEFAULT 0', 'extractor TEXT'):
+        if column.split()[0] not in columns:
+            conn.execute(f'ALTER TABLE resume_store ADD COLUMN {column}')
+
+def encode_vector(row):
+    """Serialize a single-row sparse vector as its non-zero count, column indices and weights"""
+    row = row.tocsr()
+    return (struct.pack('<I', row.nnz)
+            + row.indices.astype('<i4').tobytes()
+            + row.data.astype('<f4').tobytes())
+
+def decode_vector(blob):
+    """Return the (indices, data) arrays of a vector serialized with encode_vector"""
+    nnz = struct.unpack_from('<I', blob)[0]
+    indices = np.frombuffer(blob, dtype='<i4', count=nnz, offset=4)
+    data = np.frombuffer(blob, dtype='<f4', count=nnz, offset=4 + 4 * nnz)
+    return indices, data
+
+class ResumeStore:
+    """
+    Persistent pool of extracted, vectorized resumes
+
+    Vectors are stored alongside the text and tagged with the id of the model that
+    produced them. The matrix used for ranking is built from them on first use and
+    extended with rows added since (by any process) before each ranking; vectors
+    from an older model are recomputed automatically.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._model_id = None
+        self._vectorizer = None
+        self._reset()
+
+    def _reset(self):
+        self._matrix = None
+        self._rowids = []
+        self._row_index = {}
+        self._hashes = []
+        self._filenames = []
+        self._contacts = []
+        self._docs = []
+        self._last_rowid = 0
+        self._loaded = False
+
+    def add(self, conn, content_hash, filename, text, contact=None, public=False, extractor=None):
+        """
+        Add a resume to the store
+
+        A resume already stored with the same extractor is left as it is; one
+        extracted by a different extractor configuration is replaced.
+
+        Args:
+            public: Make the resume visible to every user (e.g. imported datasets);
+                an already stored resume is made public as well
+            extractor: Id of the extractor that produced the text (see ats_utils.extractor_id)
+
+        Returns:
+            bool: True if the resume was new or replaced
+        """
+        doc = ats_utils.preprocess_text(text)
+        vectorizer = ats_utils.get_vectorizer()
+        model_id = ats_utils.get_model_id()
+        vector = encode_vector(vectorizer.transform([doc])) if vectorizer is not None else None
+
+        with conn:
+            existing = conn.execute(
+                'SELECT extractor, is_public FROM resume_store WHERE content_hash = ?', (content_hash,)
+            ).fetchone()
+            if existing is not None and existing['extractor'] == extractor:
+                if public:
+                    conn.execute('UPDATE resume_store SET is_public = 1 WHERE content_hash = ?', (content_hash,))
+                return False
+            rowid = None
+            if existing is not None:
+                # Re-inserted above every existing rowid (SQLite would reuse the old one if it
+                # was the highest), so rankings see it as new and reload (see _ensure_current)
+                rowid = conn.execute('SELECT MAX(rowid) + 1 FROM resume_store').fetchone()[0]
+                conn.execute('DELETE FROM resume_store WHERE content_hash = ?', (content_hash,))
+                public = public or bool(existing['is_public'])
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO resume_store '
+                '(rowid, content_hash, filename, text, contact, model_id, vector, is_public, extractor) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (rowid, content_hash, filename, text, json.dumps(contact) if contact else None, model_id, vector,
+                 int(public), extractor)
+            )
+        # Rankings pick the row up from the database (see _ensure_current)
+        return cursor.rowcount == 1
+
+    def get(self, conn, content_hash, extractor=None):
+        """
+        Look up a stored resume by the hash of its file content
+
+        Args:
+            extractor: Only return the resume if its text was produced by this
+                extractor (see ats_utils.extractor_id)
+
+        Returns:
+            dict: 'filename', 'text' and 'contact' of the stored resume, or None
+        """
+        row = conn.execute(
+            'SELECT filename, text, contact, extractor FROM resume_store WHERE content_hash = ?', (content_hash,)
+        ).fetchone()
+        if row is None or (extractor is not None and row['extractor'] != extractor):
+            return None
+        return {
+            'filename': row['filename'],
+            'text': row['text'],
+            'contact': json.loads(row['contact']) if row['contact'] else None
+        }
+
+    def count(self, conn, user_id=None):
+        """Return the number of stored resumes, or of those visible to a user"""
+        if user_id is None:
+            return conn.execute('SELECT COUNT(*) FROM resume_store').fetchone()[0]
+        return len(self._visible_rows(conn, user_id))
+
+    def _visible_rows(self, conn, user_id):
+        """
+        Map the rowid of every resume a user may rank to the filename to show for it
+
+        That is public resumes and the user's own uploads, which are shown under the
+        name the user uploaded them with.
+        """
+        rows = conn.execute(
+            '''
+            SELECT s.rowid AS rowid, (
+                SELECT h.filename FROM resume_history h
+                WHERE h.user_id = ? AND h.content_hash = s.content_hash
+                ORDER BY h.id DESC LIMIT 1
+            ) AS own_filename
+            FROM resume_store s
+            WHERE s.is_public = 1 OR EXISTS (
+                SELECT 1 FROM resume_history h WHERE h.user_id = ? AND h.content_hash = s.content_hash
+            )
+            ''',
+            (user_id, user_id)
+        ).fetchall()
+        return {row['rowid']: row['own_filename'] for row in rows}
+
+    def _load(self, conn, after_rowid=0):
+        """Append the stored resumes with a rowid above after_rowid to the ranking matrix"""
+        vectorizer = ats_utils.get_vectorizer()
+        model_id = ats_utils.get_model_id()
+        rows = conn.execute(
+            'SELECT rowid, content_hash, filename, text, contact, model_id, vector FROM resume_store '
+            'WHERE rowid > ? ORDER BY rowid',
+            (after_rowid,)
+        ).fetchall()
+        if not rows:
+            return
+
+        docs = [ats_utils.preprocess_text(row['text']) for row in rows]
+        for i, row in enumerate(rows, start=len(self._rowids)):
+            self._rowids.append(row['rowid'])
+            self._row_index[row['rowid']] = i
+            self._hashes.append(row['content_hash'])
+            self._filenames.append(row['filename'])
+            self._contacts.append(json.loads(row['contact']) if row['contact'] else None)
+        self._docs.extend(docs)
+        self._last_rowid = rows[-1]['rowid']
+
+        if vectorizer is None:
+            # Without a corpus model, the stored resumes are the corpus, so every
+            # load refits the vocabulary over all of them (build_model.py avoids this)
+            vectorizer = ats_utils.create_vectorizer()
+            try:
+                self._matrix = vectorizer.fit_transform(self._docs)
+            except ValueError:
+                # Nothing but stop words and single characters: an empty vocabulary
+                self._matrix = None
+            self._vectorizer = vectorizer
+            return
+
+        stale = [i for i, row in enumerate(rows) if row['model_id'] != model_id or row['vector'] is None]
+        vectors = [row['vector'] for row in rows]
+        if stale:
+            stale_matrix = vectorizer.transform([docs[i] for i in stale])
+            updates = []
+            for position, i in enumerate(stale):
+                vectors[i] = encode_vector(stale_matrix[position])
+                updates.append((model_id, vectors[i], rows[i]['content_hash']))
+            with conn:
+                conn.executemany(
+                    'UPDATE resume_store SET model_id = ?, vector = ? WHERE content_hash = ?',
+                    updates
+                )
+
+        decoded = [decode_vector(blob) for blob in vectors]
+        indptr = np.cumsum([0] + [len(indices) for indices, _ in decoded])
+        indices = np.concatenate([i for i, _ in decoded])
+        data = np.concatenate([d for _, d in decoded])
+        new_rows = sparse.csr_matrix(
+            (data, indices, indptr),
+            shape=(len(rows), len(ats_utils.get_feature_names(vectorizer)))
+        )
+        self._matrix = new_rows if self._matrix is None else sparse.vstack([self._matrix, new_rows], format='csr')
+        self._vectorizer = vectorizer
+
+    def _ensure_current(self, conn):
+        model_id = ats_utils.get_model_id()
+        if not self._loaded or model_id != self._model_id:
+            self._reset()
+            self._model_id = model_id
+            self._load(conn)
+            self._loaded = True
+            return
+
+        new_hashes = [row['content_hash'] for row in conn.execute(
+            'SELECT content_hash FROM resume_store WHERE rowid > ?', (self._last_rowid,)
+        )]
+        if not new_hashes:
+            return
+        # A re-extracted resume comes back under a new rowid and replaces its old row
+        replaced = not set(new_hashes).isdisjoint(self._hashes)
+        if replaced:
+            self._reset()
+            self._load(conn)
+            self._loaded = True
+        else:
+            self._load(conn, after_rowid=self._last_rowid)
+
+    def rank(self, conn, job_description, top_n=10, min_score=0.0, cache_key=None,
+             top_k=ats_utils.DEFAULT_TOP_TERMS, user_id=None):
+        """
+        Rank the stored resumes against a job description
+
+        Args:
+            conn: Database connection
+            job_description: Job description text
+            top_n: Maximum number of resumes to return
+            min_score: Minimum match percentage for a resume to be returned
+            cache_key: Optional job description cache key (see ats_utils.job_cache_key)
+            top_k: Number of important job description terms to report
+            user_id: Only rank this user's uploads and public resumes (None ranks
+                every stored resume, for offline tools)
+
+        Returns:
+            list: Dictionaries with 'id', 'filename', 'match_score', 'contact' and 'details',
+            sorted by score
+        """
+        with self._lock:
+            self._ensure_current(conn)
+            if self._matrix is None or self._matrix.shape[0] == 0:
+                return []
+
+            if user_id is None:
+                rows, own_filenames = None, {}
+            else:
+                own_filenames = self._visible_rows(conn, user_id)
+                rows = np.array(sorted(
+                    self._row_index[rowid] for rowid in own_filenames if rowid in self._row_index
+                ), dtype=np.intp)
+                if not len(rows):
+                    return []
+
+            if self._model_id is not None:
+                # Corpus model: reuse the cached job description profile
+                profile = ats_utils.get_job_profile(job_description, cache_key, top_k)
+                if profile is None or not profile.processed:
+                    return []
+                job_vector, important_terms = profile.vector, profile.important_terms
+            else:
+                job_desc_processed = ats_utils.preprocess_text(job_description)
+                if not job_desc_processed:
+                    return []
+                job_vector = self._vectorizer.transform([job_desc_processed])
+                important_terms = ats_utils.get_important_terms(
+                    job_vector, ats_utils.get_feature_names(self._vectorizer), top_k
+                )
+
+            # Rows are L2-normalised, so the dot product is the cosine similarity
+            matrix = self._matrix if rows is None else self._matrix[rows]
+            scores = (matrix @ job_vector.T).toarray().ravel() * 100
+
+            candidates = np.flatnonzero(scores >= min_score)
+            top = candidates[ats_utils.top_k_indices(scores[candidates], top_n)]
+
+            results = []
+            for position in top:
+                i = position if rows is None else rows[position]
+                results.append({
+                    'id': self._hashes[i],
+                    'filename': own_filenames.get(self._rowids[i]) or self._filenames[i],
+                    'match_score': float(scores[position]),
+                    'contact': self._contacts[i],
+                    'details': ats_utils.build_match_details(float(scores[position]), important_terms, self._docs[i])
+                })
+            return results
+
+store = ResumeStore()
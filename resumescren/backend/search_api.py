@@ -1,26 +1,63 @@
 import os
+import threading
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from resume_parser import parse_resume
+import resume_index
 
 app = Flask(__name__)
 CORS(app)
 
-DATASET_DIR = r'c:/Users/arjun/OneDrive/Desktop/resumescren/dataset/dataset/data/data'
+DATASET_DIR = os.environ.get('DATASET_DIR') or r'c:/Users/arjun/OneDrive/Desktop/resumescren/dataset/dataset/data/data'
+
+# Load the persisted index; new or changed resumes are picked up in the background
+# once the first request arrives (see start_index_refresh)
+index = resume_index.load_index()
+_index_lock = threading.Lock()
+_refresh_thread = None
+_refresh_start_lock = threading.Lock()
+
+if not index.documents:
+    print(f"Warning: The resume index is empty, searches find nothing until {DATASET_DIR} has been indexed")
+
+def refresh_index():
+    """Bring the index up to date with the dataset directory and persist it"""
+    if not _index_lock.acquire(blocking=False):
+        return None
+    try:
+        if not os.path.isdir(DATASET_DIR):
+            print(f"Warning: Resume dataset directory {DATASET_DIR} does not exist, set DATASET_DIR")
+        stats = index.update_from_directory(DATASET_DIR)
+        if stats['added'] or stats['removed']:
+            index.save()
+        return stats
+    finally:
+        _index_lock.release()
+
+@app.before_request
+def start_index_refresh():
+    """Refresh the index in the background on the first request, however the app is served"""
+    global _refresh_thread
+    if _refresh_thread is not None:
+        return
+    with _refresh_start_lock:
+        if _refresh_thread is None:
+            _refresh_thread = threading.Thread(target=refresh_index, daemon=True)
+            _refresh_thread.start()
 
 @app.route('/api/search', methods=['GET'])
 def search_resumes():
-    keyword = request.args.get('keyword', '').lower()
-    results = []
-    for root, _, files in os.walk(DATASET_DIR):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                path = os.path.join(root, file)
-                parsed = parse_resume(path)
-                text = parsed.get('raw_text', '').lower()
-                if keyword in text:
-                    results.append({'filename': file, 'path': path, 'extract': text[:500]})
-    return jsonify({'matches': results})
+    keyword = request.args.get('keyword', '')
+    mode = request.args.get('mode', 'and').lower()
+    if mode not in ('and', 'or'):
+        return jsonify({'error': 'mode must be "and" or "or"'}), 400
+    return jsonify({'matches': index.search(keyword, mode=mode)})
+
+@app.route('/api/search/reindex', methods=['POST'])
+def reindex():
+    stats = refresh_index()
+    if stats is None:
+        return jsonify({'status': 'already running'}), 409
+    return jsonify({'status': 'ok', **stats})
 
 if __name__ == '__main__':
     app.run(debug=True)
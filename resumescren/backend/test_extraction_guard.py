@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Checks for the extraction guard, run against PDFs from the bundled dataset.
+Works as a script or under pytest.
+"""
+
+import io
+import os
+import glob
+import sys
+import time
+import threading
+import PyPDF2
+import extraction_guard
+import pdf_extractors
+from concurrent.futures import ProcessPoolExecutor
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dataset', 'data', 'data')
+
+def build_long_pdf(min_pages=pdf_extractors.PDF_PARALLEL_MIN_PAGES):
+    """Repeat the pages of a dataset resume until the PDF is long enough for parallel mode"""
+    source = sorted(glob.glob(os.path.join(DATASET_DIR, '*', '*.pdf')))[0]
+    writer = PyPDF2.PdfWriter()
+    while len(writer.pages) < min_pages:
+        for page in PyPDF2.PdfReader(source).pages:
+            writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+def _extract_parallel(content):
+    stats = {}
+    text = pdf_extractors.extract_text(io.BytesIO(content), name='long.pdf', mode='parallel', stats=stats)
+    return text, stats
+
+def _start_workers_and_hang():
+    pool = ProcessPoolExecutor(max_workers=2)
+    for _ in range(2):
+        pool.submit(time.sleep, 60)
+    time.sleep(60)
+
+def _print_and_return(value):
+    print(f"guarded child {value}")
+    return value
+
+def _group_running(pgid):
+    """True if any process of the group is still running (zombies waiting to be reaped do not count)"""
+    for stat_path in glob.glob('/proc/[0-9]*/stat'):
+        try:
+            with open(stat_path) as f:
+                # The fields after the command name start with the state; the pgid is the third
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[2]) == pgid and fields[0] != 'Z':
+            return True
+    return False
+
+def test_parallel_mode_under_guard():
+    """Inside the guard's child process, parallel mode extracts serially instead of starting a pool"""
+    text, stats = extraction_guard.run(_extract_parallel, build_long_pdf(), label='long.pdf')
+    assert text.strip(), "No text extracted"
+    assert stats['backend'] == 'pypdf2', f"Fell back to {stats['backend']}"
+    assert stats['mode'] == 'serial', f"Ran in {stats['mode']} mode"
+
+def test_parallel_mode_shares_the_pool():
+    """Without the guard, every parallel extraction uses the same page pool"""
+    content = build_long_pdf()
+    serial_text = pdf_extractors.extract_text(io.BytesIO(content), mode='serial')
+    pools = []
+    for _ in range(2):
+        text, stats = _extract_parallel(content)
+        assert stats['mode'] == 'parallel', f"Ran in {stats['mode']} mode"
+        assert text == serial_text
+        pools.append(pdf_extractors._page_pool)
+    assert pools[0] is pools[1]
+
+def test_timeout_stops_workers():
+    """A timed out child is killed together with the processes it started"""
+    context = extraction_guard._get_context()
+    started = []
+    original_process = context.Process
+
+    def recording_process(*args, **kwargs):
+        process = original_process(*args, **kwargs)
+        started.append(process)
+        return process
+
+    context.Process = recording_process
+    try:
+        extraction_guard.run(_start_workers_and_hang, timeout=1, label='hang')
+        raise AssertionError("Expected a timeout")
+    except extraction_guard.ExtractionError as e:
+        assert e.code == 'timeout'
+    finally:
+        context.Process = original_process
+    time.sleep(0.5)
+    assert not _group_running(started[0].pid), "Workers of the timed out child are still running"
+
+def test_concurrent_forks_with_busy_stdout(workers=4, runs_per_worker=25):
+    """
+    Upload threads fork guarded children while other threads keep printing
+
+    A child forked while another thread holds the stdout lock must not hang on
+    its own print (it would be reported as a timeout).
+    """
+    stop = threading.Event()
+    errors = []
+
+    def chatter():
+        while not stop.is_set():
+            sys.stdout.write('parent ' + 'x' * 4000 + '\n')
+
+    def forker(worker):
+        for run in range(runs_per_worker):
+            try:
+                assert extraction_guard.run(_print_and_return, (worker, run), timeout=5) == (worker, run)
+            except extraction_guard.ExtractionError as e:
+                errors.append(e.code)
+
+    chatters = [threading.Thread(target=chatter) for _ in range(3)]
+    forkers = [threading.Thread(target=forker, args=(worker,)) for worker in range(workers)]
+    for thread in chatters + forkers:
+        thread.start()
+    for thread in forkers:
+        thread.join()
+    stop.set()
+    for thread in chatters:
+        thread.join()
+    assert not errors, f"Guarded runs failed: {errors}"
+
+if __name__ == "__main__":
+    if not extraction_guard.GUARD_ENABLED:
+        raise SystemExit("EXTRACTION_GUARD=0 is set, nothing to check")
+    for check in (test_parallel_mode_under_guard, test_parallel_mode_shares_the_pool, test_timeout_stops_workers,
+                  test_concurrent_forks_with_busy_stdout):
+        check()
+        print(f"✅ {check.__name__}")
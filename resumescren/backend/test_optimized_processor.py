@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Checks for the per-file timeout of optimized_processor.iter_results.
+Works as a script or under pytest.
+"""
+
+import time
+import concurrent.futures
+from optimized_processor import iter_results
+
+def _sleep_and_return(seconds):
+    time.sleep(seconds)
+    return {'slept': seconds}
+
+def _timed_out(results):
+    return [file for file, result in results if result.get('timed_out')]
+
+def check_queue_time_not_counted(executor_class):
+    """Files waiting for a free worker do not time out: 8 x 0.5s tasks on 2 workers with a 1.2s timeout"""
+    with executor_class(max_workers=2) as executor:
+        results = list(iter_results(executor, _sleep_and_return, [0.5] * 8, max_in_flight=8, file_timeout=1.2))
+    assert [result for _, result in results] == [{'slept': 0.5}] * 8, results
+
+def check_slow_file_times_out(executor_class):
+    """A file that runs past the timeout is reported, and the others still complete in order"""
+    with executor_class(max_workers=2) as executor:
+        results = list(iter_results(executor, _sleep_and_return, [0.1, 2.0, 0.1, 0.1], max_in_flight=4, file_timeout=1.0))
+    assert _timed_out(results) == [2.0], results
+    assert [file for file, _ in results] == [0.1, 2.0, 0.1, 0.1]
+
+def test_queue_time_not_counted_threads():
+    check_queue_time_not_counted(concurrent.futures.ThreadPoolExecutor)
+
+def test_queue_time_not_counted_processes():
+    check_queue_time_not_counted(concurrent.futures.ProcessPoolExecutor)
+
+def test_slow_file_times_out_threads():
+    check_slow_file_times_out(concurrent.futures.ThreadPoolExecutor)
+
+def test_slow_file_times_out_processes():
+    check_slow_file_times_out(concurrent.futures.ProcessPoolExecutor)
+
+if __name__ == "__main__":
+    for check in (test_queue_time_not_counted_threads, test_queue_time_not_counted_processes,
+                  test_slow_file_times_out_threads, test_slow_file_times_out_processes):
+        check()
+        print(f"✅ {check.__name__}")
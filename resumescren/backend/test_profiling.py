@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Checks for request profiling on /api/upload: overlapping profiles and a
+profiler that cannot start never fail the request, and sampled requests keep
+using the upload pool. Runs the app against a scratch database.
+Works as a script or under pytest.
+"""
+
+import os
+import io
+import glob
+import cProfile
+import tempfile
+import threading
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix='profiling-')
+os.environ['RESUME_SCREENER_DB'] = os.path.join(SCRATCH_DIR, 'resume_screener.db')
+os.environ['RESUME_TEXT_CACHE'] = os.path.join(SCRATCH_DIR, 'text_cache.db')
+os.environ['PROFILE_DIR'] = os.path.join(SCRATCH_DIR, 'profiles')
+os.environ['ADMIN_USERS'] = 'profiling_admin'
+
+import app as app_module
+import profiling
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dataset', 'data', 'data')
+PROFILE = {'X-Profile': '1'}
+
+def logged_in_client(username):
+    """Register the user on first use, log in afterwards"""
+    client = app_module.app.test_client()
+    credentials = {'username': username, 'password': 'secret'}
+    if client.post('/login', json=credentials).status_code != 200:
+        client.post('/register', json=dict(credentials, email=f'{username}@example.com'))
+    return client
+
+def upload(client, query='', headers=None, **kwargs):
+    pdfs = sorted(glob.glob(os.path.join(DATASET_DIR, 'ACCOUNTANT', '*.pdf')))[:2]
+    data = {
+        'job_description': 'accountant for ledger reconciliations and tax reporting',
+        'resume': [(io.BytesIO(open(path, 'rb').read()), os.path.basename(path)) for path in pdfs]
+    }
+    return client.post(f'/api/upload{query}', data=data, content_type='multipart/form-data',
+                       headers=headers or {}, **kwargs)
+
+def test_overlapping_profiles():
+    """A profiled request made while another is still streaming runs unprofiled"""
+    admin = logged_in_client('profiling_admin')
+    streaming = upload(admin, '?stream=ndjson', PROFILE, buffered=False)
+    assert streaming.headers.get('X-Profile-Id')
+    next(iter(streaming.response))
+
+    overlapping = upload(admin, headers=PROFILE)
+    assert overlapping.status_code == 200
+    assert overlapping.headers.get('X-Profile-Id') is None
+
+    streaming.close()
+    assert upload(admin, headers=PROFILE).headers.get('X-Profile-Id')
+
+def test_profiler_that_cannot_start():
+    """If cProfile cannot be enabled (another tool is active) the request still succeeds"""
+    admin = logged_in_client('profiling_admin')
+    original_profile = profiling.cProfile.Profile
+
+    class BusyProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    profiling.cProfile.Profile = BusyProfile
+    try:
+        response = upload(admin, headers=PROFILE)
+    finally:
+        profiling.cProfile.Profile = original_profile
+    assert response.status_code == 200
+    assert response.headers.get('X-Profile-Id') is None
+    assert upload(admin, headers=PROFILE).headers.get('X-Profile-Id')
+
+def test_sampled_requests_use_the_pool():
+    """Only admin-requested profiles move the files onto the request thread"""
+    client = logged_in_client('profiling_user')
+    admin = logged_in_client('profiling_admin')
+    threads = []
+    original_process = app_module.process_resume_file
+
+    def recording_process(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return original_process(*args, **kwargs)
+
+    app_module.process_resume_file = recording_process
+    profiling.PROFILE_SAMPLE_RATE = 1.0
+    try:
+        sampled = upload(client)
+        sampled_threads, threads[:] = list(threads), []
+        requested = upload(admin, headers=PROFILE)
+    finally:
+        profiling.PROFILE_SAMPLE_RATE = 0
+        app_module.process_resume_file = original_process
+    assert sampled.headers.get('X-Profile-Id') and requested.headers.get('X-Profile-Id')
+    assert all(name.startswith('upload-file') for name in sampled_threads), sampled_threads
+    assert not any(name.startswith('upload-file') for name in threads), threads
+
+if __name__ == "__main__":
+    for check in (test_overlapping_profiles, test_profiler_that_cannot_start, test_sampled_requests_use_the_pool):
+        check()
+        print(f"✅ {check.__name__}")
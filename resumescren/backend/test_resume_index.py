@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Checks for the resume search index: AND/OR/phrase query semantics, and that
+the search API indexes the dataset by itself when served without __main__.
+Works as a script or under pytest.
+"""
+
+import os
+import glob
+import shutil
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix='resume-index-')
+os.environ['DATASET_DIR'] = os.path.join(SCRATCH_DIR, 'dataset')
+os.environ['RESUME_INDEX_PATH'] = os.path.join(SCRATCH_DIR, 'index.pkl')
+
+import resume_index
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dataset', 'data', 'data')
+
+RESUMES = {
+    'analyst.pdf': "Data analyst skilled in python and machine learning models",
+    'learner.pdf': "Eager to learning new tools; operated heavy machine equipment",
+    'java.pdf': "Backend engineer writing java services",
+    'chef.pdf': "Chef with catering experience"
+}
+
+def build():
+    index = resume_index.ResumeIndex()
+    for filename, text in RESUMES.items():
+        index.add_document(f'/resumes/{filename}', text)
+    return index
+
+def found(index, query, mode='and'):
+    return sorted(match['filename'] for match in index.search(query, mode=mode))
+
+def test_terms_default_to_and():
+    index = build()
+    assert found(index, 'machine learning') == ['analyst.pdf', 'learner.pdf']
+    assert found(index, 'python java') == []
+
+def test_or_mode_and_keywords():
+    index = build()
+    assert found(index, 'python java', mode='or') == ['analyst.pdf', 'java.pdf']
+    assert found(index, 'python OR java') == ['analyst.pdf', 'java.pdf']
+    # An explicit AND overrides the default between two terms
+    assert found(index, 'machine AND python', mode='or') == ['analyst.pdf']
+    assert found(index, 'python OR java catering') == []
+    assert found(index, 'python OR chef OR java') == ['analyst.pdf', 'chef.pdf', 'java.pdf']
+
+def test_quoted_phrase_matches_adjacent_terms_in_order():
+    index = build()
+    assert found(index, '"machine learning"') == ['analyst.pdf']
+    assert found(index, '"learning machine"') == []
+    assert found(index, '"machine learning" OR java') == ['analyst.pdf', 'java.pdf']
+
+def test_removed_documents_are_not_found():
+    index = build()
+    index.remove_document('/resumes/java.pdf')
+    assert found(index, 'java') == []
+    assert 'java' not in index.postings
+
+def test_search_api_indexes_on_first_request():
+    """Imported by a WSGI server, the API builds its index without an explicit reindex"""
+    os.makedirs(os.environ['DATASET_DIR'])
+    source = sorted(glob.glob(os.path.join(DATASET_DIR, 'ACCOUNTANT', '*.pdf')))[0]
+    shutil.copy(source, os.environ['DATASET_DIR'])
+    import search_api
+
+    client = search_api.app.test_client()
+    client.get('/api/search?keyword=accountant')
+    search_api._refresh_thread.join(timeout=60)
+    matches = client.get('/api/search?keyword=accountant').get_json()['matches']
+    assert [match['filename'] for match in matches] == [os.path.basename(source)]
+    assert os.path.exists(os.environ['RESUME_INDEX_PATH'])
+
+if __name__ == "__main__":
+    for check in (test_terms_default_to_and, test_or_mode_and_keywords,
+                  test_quoted_phrase_matches_adjacent_terms_in_order, test_removed_documents_are_not_found,
+                  test_search_api_indexes_on_first_request):
+        check()
+        print(f"✅ {check.__name__}")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Checks for the resume store behind /api/rank-resumes: results are scoped to the
+caller, and uploads from other processes are picked up. Each check runs with a
+corpus model and with per-request fitting. Works as a script or under pytest.
+Two ResumeStore instances on one database stand in for two server processes.
+"""
+
+import os
+import tempfile
+import threading
+import db
+import ats_utils
+import resume_store
+
+RESUMES = {
+    'accountant': "Senior accountant: general ledger, reconciliations, tax returns, GAAP reporting, Excel",
+    'chef': "Executive chef running a busy kitchen, menu planning, food safety, catering and staff training",
+    'developer': "Python developer building Flask APIs with SQL databases, Git, Docker and AWS deployments",
+    'teacher': "Primary school teacher planning lessons, classroom management and parent communication"
+}
+JOB_DESCRIPTION = "accountant for ledger reconciliations and tax reporting"
+
+def scratch_database():
+    conn = db.connect(os.path.join(tempfile.mkdtemp(prefix='resume-store-'), 'store.db'))
+    with conn:
+        resume_store.init_schema(conn)
+        # The columns of the app's resume_history table the store relies on
+        conn.execute('''
+            CREATE TABLE resume_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                content_hash TEXT
+            )
+        ''')
+    return conn
+
+def upload(conn, store, user_id, name, filename=None):
+    """Add a resume the way /api/upload does: store it, then record it in the user's history"""
+    store.add(conn, name, f'{name}.pdf', RESUMES[name])
+    with conn:
+        conn.execute(
+            'INSERT INTO resume_history (user_id, filename, content_hash) VALUES (?, ?, ?)',
+            (user_id, filename or f'{name}.pdf', name)
+        )
+
+def ranked_ids(store, conn, user_id=None):
+    return sorted(result['id'] for result in store.rank(conn, JOB_DESCRIPTION, top_n=10, user_id=user_id))
+
+def with_each_model(check):
+    """Run a check with a corpus model and without one"""
+    def run():
+        for vectorizer in (ats_utils.create_vectorizer().fit(list(RESUMES.values())), None):
+            ats_utils.set_vectorizer(vectorizer)
+            check()
+    run.__name__ = check.__name__
+    return run
+
+@with_each_model
+def test_rank_is_scoped_to_the_caller():
+    """Users rank their own uploads and public imports, never other users' uploads"""
+    conn = scratch_database()
+    store = resume_store.ResumeStore()
+    upload(conn, store, 1, 'accountant', filename='my_candidate.pdf')
+    upload(conn, store, 2, 'developer')
+    store.add(conn, 'chef', 'chef.pdf', RESUMES['chef'], public=True)
+
+    assert ranked_ids(store, conn, user_id=1) == ['accountant', 'chef']
+    assert ranked_ids(store, conn, user_id=2) == ['chef', 'developer']
+    assert ranked_ids(store, conn, user_id=3) == ['chef']
+    assert store.count(conn, user_id=1) == 2
+    # Shown under the caller's own filename
+    top = store.rank(conn, JOB_DESCRIPTION, top_n=1, user_id=1)[0]
+    assert (top['id'], top['filename']) == ('accountant', 'my_candidate.pdf')
+
+@with_each_model
+def test_rank_sees_uploads_from_other_processes():
+    """A resume added through another store instance is ranked without a restart"""
+    conn = scratch_database()
+    first, second = resume_store.ResumeStore(), resume_store.ResumeStore()
+    upload(conn, first, 1, 'chef')
+    assert ranked_ids(first, conn, user_id=1) == ['chef']
+
+    upload(conn, second, 1, 'accountant')
+    assert ranked_ids(first, conn, user_id=1) == ['accountant', 'chef']
+
+@with_each_model
+def test_concurrent_adds_are_loaded_once():
+    """Adds racing with rankings never leave a resume twice in the ranking matrix"""
+    conn = scratch_database()
+    store = resume_store.ResumeStore()
+    names = [f'resume{i}' for i in range(40)]
+    for i, name in enumerate(names):
+        RESUMES[name] = list(RESUMES.values())[i % 4] + f' reference {i}'
+
+    def add_all():
+        add_conn = db.connect(conn.execute('PRAGMA database_list').fetchone()['file'])
+        for name in names:
+            store.add(add_conn, name, f'{name}.pdf', RESUMES[name], public=True)
+        add_conn.close()
+
+    adder = threading.Thread(target=add_all)
+    adder.start()
+    while adder.is_alive():
+        store.rank(conn, JOB_DESCRIPTION)
+    adder.join()
+    store.rank(conn, JOB_DESCRIPTION)
+
+    assert len(store._hashes) == len(set(store._hashes)) == store.count(conn)
+    assert store._matrix.shape[0] == len(store._hashes)
+    for name in names:
+        del RESUMES[name]
+
+@with_each_model
+def test_reextracted_resume_replaces_stored_text():
+    """Text from another extractor configuration is a miss, and re-adding it replaces the stored resume"""
+    conn = scratch_database()
+    store = resume_store.ResumeStore()
+    store.add(conn, 'resume', 'resume.pdf', RESUMES['chef'], public=True, extractor='pypdf2:v1')
+    assert store.get(conn, 'resume', extractor='pypdf2:v1')['text'] == RESUMES['chef']
+    assert ranked_ids(store, conn) == ['resume']
+
+    assert store.get(conn, 'resume', extractor='pypdf2:v2') is None
+    assert store.add(conn, 'resume', 'resume.pdf', RESUMES['accountant'], extractor='pypdf2:v2')
+    assert store.get(conn, 'resume', extractor='pypdf2:v2')['text'] == RESUMES['accountant']
+    assert not store.add(conn, 'resume', 'resume.pdf', RESUMES['accountant'], extractor='pypdf2:v2')
+
+    # Ranked once, with the new text, and still public
+    results = store.rank(conn, JOB_DESCRIPTION, user_id=3)
+    assert [result['id'] for result in results] == ['resume']
+    assert results[0]['match_score'] > 0
+    assert store._matrix.shape[0] == 1
+
+@with_each_model
+def test_resumes_without_terms():
+    """Resumes with nothing but stop words and single characters rank as no match"""
+    conn = scratch_database()
+    store = resume_store.ResumeStore()
+    store.add(conn, 'empty', 'empty.pdf', "the and of a b c - 1 2 3", public=True)
+    assert all(result['match_score'] == 0 for result in store.rank(conn, JOB_DESCRIPTION, user_id=3))
+
+    store.add(conn, 'chef', 'chef.pdf', RESUMES['chef'], public=True)
+    assert 'chef' in ranked_ids(store, conn, user_id=3)
+
+if __name__ == "__main__":
+    for check in (test_rank_is_scoped_to_the_caller, test_rank_sees_uploads_from_other_processes,
+                  test_concurrent_adds_are_loaded_once, test_reextracted_resume_replaces_stored_text,
+                  test_resumes_without_terms):
+        check()
+        print(f"✅ {check.__name__}")
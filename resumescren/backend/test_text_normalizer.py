@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Checks for text normalization and term matching: important terms only match
+whole tokens, and technology names with symbols survive normalization.
+Works as a script or under pytest.
+"""
+
+import ats_utils
+import text_normalizer
+
+def test_java_does_not_match_javascript():
+    """A job description term "java" does not hit a resume that only mentions JavaScript"""
+    resume = ats_utils.preprocess_text("Frontend developer: JavaScript, TypeScript and React")
+    details = ats_utils.build_match_details(40.0, ['java', 'javascript'], resume)
+    assert details['term_hits'] == {'java': 0, 'javascript': 1}
+    assert details['matched_terms'] == ['javascript']
+    assert details['missing_terms'] == ['java']
+
+def test_symbol_terms_survive_normalization():
+    assert text_normalizer.tokenize("Skills: C++, C#/.NET and F#") == ['skills', 'c++', 'c#', 'net', 'and', 'f#']
+    assert text_normalizer.normalize("C++ and C# developer", keep_digits=False) == 'c++ and c# developer'
+    # Elsewhere the symbols still separate tokens
+    assert text_normalizer.tokenize("a+b #hashtag c++11") == ['a', 'b', 'hashtag', 'c', '11']
+
+def test_symbol_terms_are_scored_and_matched():
+    resumes = ["Systems engineer writing C++ and Python", "Game developer using C# and Unity"]
+    vectorizer = ats_utils.create_vectorizer().fit([ats_utils.preprocess_text(text) for text in resumes])
+    vocabulary = set(ats_utils.get_feature_names(vectorizer))
+    assert {'c++', 'c#'} <= vocabulary
+
+    resume = ats_utils.preprocess_text(resumes[0])
+    details = ats_utils.build_match_details(50.0, ['c++', 'c#'], resume)
+    assert details['term_hits'] == {'c++': 1, 'c#': 0}
+
+if __name__ == "__main__":
+    for check in (test_java_does_not_match_javascript, test_symbol_terms_survive_normalization,
+                  test_symbol_terms_are_scored_and_matched):
+        check()
+        print(f"✅ {check.__name__}")
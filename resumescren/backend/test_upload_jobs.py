@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Checks that background upload jobs run exactly once when several server
+processes share the database. Each JobQueue gets its own worker id, so two
+queues in one process stand in for two server processes.
+Works as a script or under pytest.
+"""
+
+import os
+import time
+import tempfile
+import threading
+from collections import Counter
+import db
+import upload_jobs
+
+def use_scratch_database():
+    path = os.path.join(tempfile.mkdtemp(prefix='upload-jobs-'), 'jobs.db')
+    db.pool = db.ConnectionPool(path)
+    with db.connection() as conn:
+        with conn:
+            upload_jobs.init_schema(conn)
+
+class Recorder:
+    """process_fn/finalize_fn pair that counts how often each file and job is handled"""
+
+    def __init__(self):
+        self.files = Counter()
+        self.options = {}
+        self.finalized = Counter()
+        self._lock = threading.Lock()
+
+    def process(self, filename, content, job_description, **options):
+        time.sleep(0.01)
+        with self._lock:
+            self.files[(job_description, filename)] += 1
+            self.options[(job_description, filename)] = options
+        return {'filename': filename, 'success': True}
+
+    def finalize(self, conn, user_id, job_description, results):
+        with self._lock:
+            self.finalized[job_description] += 1
+
+def wait_for(job_ids, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with db.connection() as conn:
+            statuses = [conn.execute('SELECT status FROM upload_jobs WHERE id = ?', (job_id,)).fetchone()['status']
+                        for job_id in job_ids]
+        if all(status in ('completed', 'failed') for status in statuses):
+            return statuses
+        time.sleep(0.02)
+    raise AssertionError(f"Jobs did not finish: {statuses}")
+
+def test_job_runs_once_across_workers(jobs=20, files_per_job=3):
+    """A job submitted in one process is not run again by another process starting up"""
+    use_scratch_database()
+    recorder = Recorder()
+    first = upload_jobs.JobQueue(recorder.process, recorder.finalize)
+    first.start()
+
+    job_ids = []
+    for job in range(jobs):
+        files = [(f'resume{position}.pdf', b'%PDF') for position in range(files_per_job)]
+        job_ids.append(first.submit(1, f'job {job}', files))
+        # A second process serving its first request scans for pending jobs
+        upload_jobs.JobQueue(recorder.process, recorder.finalize).start()
+
+    assert wait_for(job_ids) == ['completed'] * jobs
+    assert set(recorder.files.values()) == {1}, recorder.files
+    assert len(recorder.files) == jobs * files_per_job
+    assert set(recorder.finalized.values()) == {1}, recorder.finalized
+
+def test_only_stale_running_jobs_are_taken_over():
+    """A running job is resumed by another process only once its lease has expired"""
+    use_scratch_database()
+    with db.connection() as conn:
+        with conn:
+            for job_id, heartbeat in (('stale', "datetime('now', '-1 hour')"), ('alive', 'CURRENT_TIMESTAMP')):
+                conn.execute(
+                    "INSERT INTO upload_jobs (id, user_id, status, job_description, total_files, worker, heartbeat_at) "
+                    f"VALUES (?, 1, 'running', ?, 1, 'elsewhere', {heartbeat})",
+                    (job_id, job_id)
+                )
+                conn.execute(
+                    "INSERT INTO upload_job_files (job_id, position, filename, content) VALUES (?, 0, 'resume.pdf', ?)",
+                    (job_id, b'%PDF')
+                )
+
+    recorder = Recorder()
+    upload_jobs.JobQueue(recorder.process, recorder.finalize, lease_seconds=60).start()
+
+    assert wait_for(['stale']) == ['completed']
+    time.sleep(0.2)
+    assert recorder.files == Counter({('stale', 'resume.pdf'): 1}), recorder.files
+    with db.connection() as conn:
+        alive = conn.execute("SELECT status, worker FROM upload_jobs WHERE id = 'alive'").fetchone()
+    assert (alive['status'], alive['worker']) == ('running', 'elsewhere')
+
+def test_scoring_options_reach_process_fn():
+    """top_k and the job description cache key are kept with the job, also across a restart"""
+    use_scratch_database()
+    recorder = Recorder()
+    queue = upload_jobs.JobQueue(recorder.process, recorder.finalize)
+    job_ids = [
+        queue.submit(1, 'with options', [('resume.pdf', b'%PDF')], cache_key='template:7', top_k=50),
+        queue.submit(1, 'defaults', [('resume.pdf', b'%PDF')])
+    ]
+    assert wait_for(job_ids) == ['completed'] * 2
+    assert recorder.options == {
+        ('with options', 'resume.pdf'): {'cache_key': 'template:7', 'top_k': 50},
+        ('defaults', 'resume.pdf'): {}
+    }
+
+if __name__ == "__main__":
+    for check in (test_job_runs_once_across_workers, test_only_stale_running_jobs_are_taken_over,
+                  test_scoring_options_reach_process_fn):
+        check()
+        print(f"✅ {check.__name__}")
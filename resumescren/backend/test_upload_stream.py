@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Checks for streamed uploads (/api/upload?stream=ndjson): a client that stops
+reading early does not lose the upload. Runs the app against a scratch database.
+Works as a script or under pytest.
+"""
+
+import os
+import io
+import glob
+import json
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix='upload-stream-')
+os.environ['RESUME_SCREENER_DB'] = os.path.join(SCRATCH_DIR, 'resume_screener.db')
+os.environ['RESUME_TEXT_CACHE'] = os.path.join(SCRATCH_DIR, 'text_cache.db')
+
+import app as app_module
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dataset', 'data', 'data')
+
+def logged_in_client(username):
+    client = app_module.app.test_client()
+    response = client.post('/register', json={'username': username, 'email': f'{username}@example.com',
+                                              'password': 'secret'})
+    assert response.status_code in (200, 201), response.get_data(as_text=True)
+    return client
+
+def upload_form(count=3):
+    pdfs = sorted(glob.glob(os.path.join(DATASET_DIR, 'ACCOUNTANT', '*.pdf')))[:count]
+    return {
+        'job_description': 'accountant for ledger reconciliations and tax reporting',
+        'resume': [(io.BytesIO(open(path, 'rb').read()), os.path.basename(path)) for path in pdfs]
+    }
+
+def history_total(client):
+    return client.get('/api/history').get_json()['total']
+
+def test_stream_read_to_completion_saves_history():
+    client = logged_in_client('stream_complete')
+    response = client.post('/api/upload?stream=ndjson', data=upload_form(), content_type='multipart/form-data')
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record['type'] for record in records] == ['result'] * 3 + ['summary']
+    assert history_total(client) == 3
+
+def test_stream_closed_early_saves_history():
+    """The client disconnects after the first result; every file still ends up in history"""
+    client = logged_in_client('stream_closed')
+    response = client.post('/api/upload?stream=ndjson', data=upload_form(), content_type='multipart/form-data',
+                           buffered=False)
+    first = json.loads(next(iter(response.response)))
+    assert first['type'] == 'result'
+    response.close()
+    assert history_total(client) == 3
+
+if __name__ == "__main__":
+    for check in (test_stream_read_to_completion_saves_history, test_stream_closed_early_saves_history):
+        check()
+        print(f"✅ {check.__name__}")
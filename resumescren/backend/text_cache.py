@@ -0,0 +1,105 @@
+# Resume Text Extraction Cache
+# Stores extracted resume text keyed by the SHA-256 of the file bytes and the
+# extractor that produced it, so the same document is only parsed once.
+import os
+import sqlite3
+import hashlib
+import threading
+
+CACHE_PATH = os.environ.get('RESUME_TEXT_CACHE') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'cache', 'extraction_cache.db'
+)
+
+# One connection per thread, since sqlite3 connections cannot be shared across threads
+_local = threading.local()
+
+def _get_connection():
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and getattr(_local, 'path', None) == CACHE_PATH:
+        return conn
+
+    directory = os.path.dirname(CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS extracted_text (
+            content_hash TEXT NOT NULL,
+            extractor TEXT NOT NULL,
+            text TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (content_hash, extractor)
+        )
+    ''')
+    conn.commit()
+    _local.conn = conn
+    _local.path = CACHE_PATH
+    return conn
+
+def set_cache_path(path):
+    """Point the cache at a different database file (used by tools and tests)"""
+    global CACHE_PATH
+    CACHE_PATH = path
+
+def hash_content(data):
+    """Return the SHA-256 hex digest of the given bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_text(content_hash, extractor):
+    """Return cached text for a document, or None if it has not been extracted yet"""
+    try:
+        row = _get_connection().execute(
+            'SELECT text FROM extracted_text WHERE content_hash = ? AND extractor = ?',
+            (content_hash, extractor)
+        ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Error reading extraction cache: {str(e)}")
+        return None
+    return row[0] if row else None
+
+def put_text(content_hash, extractor, text):
+    """Store extracted text for a document"""
+    try:
+        conn = _get_connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO extracted_text (content_hash, extractor, text) VALUES (?, ?, ?)',
+            (content_hash, extractor, text)
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error writing extraction cache: {str(e)}")
+
+def cached_extract(source, extract_fn, extractor):
+    """
+    Extract text from a file, consulting the cache first
+
+    Args:
+        source: Path to the resume file, or its contents as bytes
+        extract_fn: Function taking the source and returning the extracted text
+        extractor: Name and version of the extractor, part of the cache key
+
+    Returns:
+        str: The extracted text (empty results are returned but not cached)
+    """
+    if isinstance(source, (bytes, bytearray)):
+        content_hash = hash_content(source)
+    else:
+        content_hash = hash_file(source)
+    text = get_text(content_hash, extractor)
+    if text is not None:
+        return text
+
+    text = extract_fn(source)
+    if text and text.strip():
+        put_text(content_hash, extractor, text)
+    return text
@@ -0,0 +1,103 @@
+# Text Normalizer
+# Shared lowercasing/cleaning/tokenizing for scoring, matching and search. Text is
+# normalized in a single translate pass over its ASCII bytes, and the vectorizers
+# consume the normalized tokens directly instead of re-tokenizing with a regex.
+import string
+from collections import Counter
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+def _build_table(keep):
+    """Byte translation table that lowercases ASCII letters, keeps the given bytes and blanks the rest"""
+    table = bytearray(b' ' * 256)
+    for char in keep.encode('ascii'):
+        table[char] = char
+    for char in string.ascii_uppercase.encode('ascii'):
+        table[char] = char + 32
+    return bytes(table)
+
+# Terms whose symbols are part of the name; elsewhere '+' and '#' separate tokens
+SYMBOL_TERMS = frozenset({'c++', 'c#', 'f#', 'g++'})
+_SYMBOLS = '+#'
+
+# Non-ASCII characters are encoded as '?', which the tables turn into spaces.
+# The symbols are kept by the tables and dropped again outside SYMBOL_TERMS.
+ALNUM_TABLE = _build_table(string.ascii_lowercase + string.digits + _SYMBOLS)
+ALPHA_TABLE = _build_table(string.ascii_lowercase + _SYMBOLS)
+_SYMBOL_TABLE = str.maketrans(_SYMBOLS, ' ' * len(_SYMBOLS))
+
+def _split_symbols(tokens):
+    """Split tokens on '+' and '#' unless they are one of SYMBOL_TERMS"""
+    split = []
+    for token in tokens:
+        if token in SYMBOL_TERMS or ('+' not in token and '#' not in token):
+            split.append(token)
+        else:
+            split.extend(token.translate(_SYMBOL_TABLE).split())
+    return split
+
+def tokenize(text, keep_digits=True):
+    """
+    Split text into lowercase ASCII alphanumeric tokens
+
+    Technology names such as "c++" and "c#" (SYMBOL_TERMS) are kept as tokens.
+
+    Args:
+        text: Text to tokenize
+        keep_digits: If False, digits are treated as separators as well
+
+    Returns:
+        list: Tokens in document order
+    """
+    if not text:
+        return []
+    table = ALNUM_TABLE if keep_digits else ALPHA_TABLE
+    normalized = text.encode('ascii', 'replace').translate(table).decode('ascii')
+    tokens = normalized.split()
+    if '+' in normalized or '#' in normalized:
+        tokens = _split_symbols(tokens)
+    return tokens
+
+def normalize(text, keep_digits=True):
+    """Return text as its space-separated tokens (see tokenize)"""
+    return ' '.join(tokenize(text, keep_digits))
+
+def ngram_counts(tokens, max_n=1):
+    """
+    Count the tokens and word n-grams of a token sequence
+
+    Args:
+        tokens: List of tokens, e.g. from tokenize()
+        max_n: Longest n-gram to count
+
+    Returns:
+        Counter: Occurrences keyed by the space-joined n-gram
+    """
+    counts = Counter(tokens)
+    for n in range(2, max_n + 1):
+        counts.update(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return counts
+
+class TokenAnalyzer:
+    """
+    Vectorizer analyzer for normalized text
+
+    Splits on spaces, drops English stop words and single-character tokens, and
+    optionally builds word n-grams, matching TfidfVectorizer's word analyzer on
+    text that has already been through normalize().
+    """
+
+    def __init__(self, ngram_range=(1, 1), stop_words=True):
+        self.ngram_range = ngram_range
+        self.stop_words = stop_words
+
+    def __call__(self, doc):
+        stop_words = ENGLISH_STOP_WORDS if self.stop_words else ()
+        tokens = [token for token in doc.split() if len(token) > 1 and token not in stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        ngrams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            ngrams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return ngrams
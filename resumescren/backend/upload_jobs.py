@@ -0,0 +1,268 @@
+# Upload Job Queue
+# Runs resume uploads in the background so /api/upload can return immediately.
+# Jobs and their files are persisted in SQLite, so queued work survives a restart.
+# Several server processes can share the database: each job is claimed by one
+# worker, which holds it with a heartbeat lease while it runs.
+import os
+import json
+import uuid
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import db
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 4
+# A running job whose heartbeat is older than this is assumed abandoned and may be
+# taken over. It must exceed the time one file can take (see extraction_guard).
+LEASE_SECONDS = int(os.environ.get('UPLOAD_JOB_LEASE_SECONDS') or 300)
+
+def init_schema(conn):
+    """Create the job tables if they do not exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS upload_jobs (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            job_description TEXT NOT NULL,
+            cache_key TEXT,
+            top_k INTEGER,
+            total_files INTEGER NOT NULL,
+            processed INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            worker TEXT,
+            heartbeat_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    # Databases created before jobs were claimed by a worker or kept their scoring options
+    job_columns = {row['name'] for row in conn.execute('PRAGMA table_info(upload_jobs)')}
+    for column in ('worker TEXT', 'heartbeat_at TIMESTAMP', 'cache_key TEXT', 'top_k INTEGER'):
+        if column.split()[0] not in job_columns:
+            conn.execute(f'ALTER TABLE upload_jobs ADD COLUMN {column}')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS upload_job_files (
+            job_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            content BLOB,
+            status TEXT NOT NULL DEFAULT 'pending',
+            result TEXT,
+            PRIMARY KEY (job_id, position),
+            FOREIGN KEY (job_id) REFERENCES upload_jobs (id)
+        )
+    ''')
+
+class LeaseLost(Exception):
+    """The job was taken over by another worker after this one's lease expired"""
+
+class JobQueue:
+    """
+    Background queue of multi-file upload jobs
+
+    Args:
+        process_fn: Called as process_fn(filename, content, job_description, **options)
+            for each file, where options holds the cache_key and top_k the job was
+            submitted with (when given); returns the per-file result dictionary
+        finalize_fn: Optional, called as finalize_fn(conn, user_id, job_description, results)
+            once every file is done and before the job is marked completed; it may add
+            fields to the results before they are stored
+        max_workers: Number of jobs processed concurrently
+        lease_seconds: Heartbeat age after which a running job may be taken over
+    """
+
+    def __init__(self, process_fn, finalize_fn=None, max_workers=MAX_WORKERS, lease_seconds=LEASE_SECONDS):
+        self.process_fn = process_fn
+        self.finalize_fn = finalize_fn
+        self.max_workers = max_workers
+        self.lease_seconds = lease_seconds
+        self.worker_id = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker pool and pick up queued or abandoned jobs (idempotent)"""
+        if self._executor is not None:
+            return
+        with self._lock:
+            if self._executor is not None:
+                return
+            # Set here rather than in __init__ so each (possibly forked) process gets its own id
+            self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='upload-job')
+
+        # Jobs still queued, or running under an expired lease; each is run by
+        # whichever process claims it first (see _claim)
+        with db.connection() as conn:
+            pending = conn.execute(
+                "SELECT id FROM upload_jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < datetime('now', ?))) "
+                "ORDER BY created_at",
+                (f'-{self.lease_seconds} seconds',)
+            ).fetchall()
+        for row in pending:
+            logger.info(f"Resuming upload job {row['id']}")
+            self._executor.submit(self._run, row['id'])
+
+    def submit(self, user_id, job_description, files, cache_key=None, top_k=None):
+        """
+        Persist a new job and queue it for processing
+
+        Args:
+            user_id: Owner of the job
+            job_description: Job description to score against
+            files: List of (filename, content bytes) tuples
+            cache_key: Optional job description cache key, passed on to process_fn
+            top_k: Optional number of important terms, passed on to process_fn
+
+        Returns:
+            str: The job id
+        """
+        self.start()
+        job_id = uuid.uuid4().hex
+        with db.connection() as conn:
+            with conn:
+                conn.execute(
+                    'INSERT INTO upload_jobs (id, user_id, status, job_description, cache_key, top_k, total_files) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (job_id, user_id, 'queued', job_description, cache_key, top_k, len(files))
+                )
+                conn.executemany(
+                    'INSERT INTO upload_job_files (job_id, position, filename, content) VALUES (?, ?, ?, ?)',
+                    [(job_id, position, filename, content) for position, (filename, content) in enumerate(files)]
+                )
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _run(self, job_id):
+        try:
+            self._process(job_id)
+        except LeaseLost:
+            logger.warning(f"Upload job {job_id} was taken over by another worker")
+        except Exception as e:
+            logger.error(f"Upload job {job_id} failed: {str(e)}", exc_info=True)
+            with db.connection() as conn:
+                with conn:
+                    conn.execute(
+                        "UPDATE upload_jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP "
+                        "WHERE id = ? AND worker = ?",
+                        (str(e), job_id, self.worker_id)
+                    )
+
+    def _claim(self, conn, job_id):
+        """Atomically take a queued (or abandoned) job for this worker; False if someone else has it"""
+        with conn:
+            cursor = conn.execute(
+                "UPDATE upload_jobs SET status = 'running', worker = ?, heartbeat_at = CURRENT_TIMESTAMP, "
+                "started_at = COALESCE(started_at, CURRENT_TIMESTAMP) "
+                "WHERE id = ? AND (status = 'queued' OR (status = 'running' "
+                "AND (heartbeat_at IS NULL OR heartbeat_at < datetime('now', ?))))",
+                (self.worker_id, job_id, f'-{self.lease_seconds} seconds')
+            )
+        return cursor.rowcount == 1
+
+    def _heartbeat(self, conn, job_id, processed=0, failed=0):
+        """Renew the lease (inside the caller's transaction), raising LeaseLost if the job is no longer ours"""
+        cursor = conn.execute(
+            'UPDATE upload_jobs SET processed = processed + ?, failed = failed + ?, heartbeat_at = CURRENT_TIMESTAMP '
+            'WHERE id = ? AND worker = ?',
+            (processed, failed, job_id, self.worker_id)
+        )
+        if cursor.rowcount != 1:
+            raise LeaseLost(job_id)
+
+    def _process(self, job_id):
+        with db.connection() as conn:
+            job = conn.execute('SELECT * FROM upload_jobs WHERE id = ?', (job_id,)).fetchone()
+            if job is None or not self._claim(conn, job_id):
+                return
+            pending = conn.execute(
+                "SELECT position, filename FROM upload_job_files WHERE job_id = ? AND status = 'pending' ORDER BY position",
+                (job_id,)
+            ).fetchall()
+            # Only the options the job was submitted with, so process_fn defaults apply otherwise
+            options = {name: job[name] for name in ('cache_key', 'top_k') if job[name] is not None}
+
+            for row in pending:
+                content = conn.execute(
+                    'SELECT content FROM upload_job_files WHERE job_id = ? AND position = ?',
+                    (job_id, row['position'])
+                ).fetchone()['content']
+                result = self.process_fn(row['filename'], content or b'', job['job_description'], **options)
+                failed = 1 if result.get('error') else 0
+
+                # The upload bytes are no longer needed once the file has a result
+                with conn:
+                    self._heartbeat(conn, job_id, processed=1 - failed, failed=failed)
+                    conn.execute(
+                        "UPDATE upload_job_files SET status = 'done', result = ?, content = NULL WHERE job_id = ? AND position = ?",
+                        (json.dumps(result), job_id, row['position'])
+                    )
+
+            # Check the lease right before writing history, which cannot be undone
+            with conn:
+                self._heartbeat(conn, job_id)
+            results = self._results(conn, job_id)
+            if self.finalize_fn is not None:
+                self.finalize_fn(conn, job['user_id'], job['job_description'], results)
+            with conn:
+                if self.finalize_fn is not None:
+                    conn.executemany(
+                        'UPDATE upload_job_files SET result = ? WHERE job_id = ? AND position = ?',
+                        [(json.dumps(result), job_id, position) for position, result in enumerate(results)]
+                    )
+                conn.execute(
+                    "UPDATE upload_jobs SET status = 'completed', finished_at = CURRENT_TIMESTAMP WHERE id = ? AND worker = ?",
+                    (job_id, self.worker_id)
+                )
+
+    def _results(self, conn, job_id):
+        rows = conn.execute(
+            "SELECT result FROM upload_job_files WHERE job_id = ? AND status = 'done' ORDER BY position",
+            (job_id,)
+        ).fetchall()
+        return [json.loads(row['result']) for row in rows]
+
+    def get(self, job_id, user_id):
+        """Return a job's status and the results of its finished files, or None if not found"""
+        with db.connection() as conn:
+            job = conn.execute(
+                'SELECT * FROM upload_jobs WHERE id = ? AND user_id = ?',
+                (job_id, user_id)
+            ).fetchone()
+            if job is None:
+                return None
+            status = _job_summary(job)
+            status['results'] = self._results(conn, job_id)
+            return status
+
+    def list(self, user_id, limit=20, offset=0):
+        """Return the most recent jobs of a user without their results"""
+        with db.connection() as conn:
+            jobs = conn.execute(
+                'SELECT * FROM upload_jobs WHERE user_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?',
+                (user_id, limit, offset)
+            ).fetchall()
+        return [_job_summary(job) for job in jobs]
+
+def _job_summary(job):
+    total = job['total_files']
+    done = job['processed'] + job['failed']
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'total_files': total,
+        'processed': job['processed'],
+        'failed': job['failed'],
+        'progress': round(100.0 * done / total, 1) if total else 100.0,
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    }
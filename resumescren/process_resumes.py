@@ -1,21 +1,23 @@
 import os
-import PyPDF2
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import pandas as pd
 import re
 from tqdm import tqdm
+from backend import text_cache, text_normalizer, pdf_extractors
+
+# Extractor identifier used as part of the text cache key
+PDF_EXTRACTOR = pdf_extractors.chain_id()
+
+def extract_text_from_pdf(file_path):
+    """Extract text from a PDF file with the configured backend chain."""
+    return pdf_extractors.extract_text(file_path)
 
 def extract_text_from_file(file_path):
     """Extract text from file (PDF or TXT)."""
     try:
         if file_path.lower().endswith('.pdf'):
-            text = ""
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
-            return text
+            return text_cache.cached_extract(file_path, extract_text_from_pdf, PDF_EXTRACTOR)
         elif file_path.lower().endswith(('.txt', '.text')):
             with open(file_path, 'r', encoding='utf-8') as file:
                 return file.read()
@@ -28,11 +30,8 @@ def extract_text_from_file(file_path):
 
 def preprocess_text(text):
     """Basic text preprocessing."""
-    # Convert to lowercase and remove special characters
-    text = text.lower()
-    text = re.sub(r'\W', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    # Lowercase, drop special characters and collapse whitespace in one pass
+    return text_normalizer.normalize(text)
 
 def calculate_similarity(job_desc, resume_text):
     """Calculate cosine similarity between job description and resume."""
@@ -60,7 +59,7 @@ def process_resumes(job_desc, dataset_path):
                 category = os.path.basename(os.path.dirname(file_path))
                 
                 # Extract and preprocess text
-                resume_text = extract_text_from_pdf(file_path)
+                resume_text = extract_text_from_file(file_path)
                 if not resume_text:
                     print(f"Could not extract text from {file}")
                     continue